@@ -0,0 +1,255 @@
+import os
+import re
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .singleflight import SingleFlight
+
+try:
+    import redis  # 공유 캐시 계층용 (선택 의존성)
+except ImportError:
+    redis = None
+
+# ------------------------------
+# 캐시 설정 (환경 변수로 조정 가능)
+# ------------------------------
+API_CACHE_LOCAL_SIZE = int(os.getenv("API_CACHE_LOCAL_SIZE", "2048"))  # 프로세스 내 LRU 항목 수
+# 공유 계층: 비워두면 사용 안 함, "sqlite:///경로" 또는 "redis://호스트:포트/DB"
+API_CACHE_URL = os.getenv("API_CACHE_URL", "")
+API_CACHE_NEGATIVE_TTL = int(os.getenv("API_CACHE_NEGATIVE_TTL", "600"))  # 빈 결과 캐시 시간(초)
+API_CACHE_DEFAULT_TTL = int(os.getenv("API_CACHE_DEFAULT_TTL", "3600"))
+
+# 엔드포인트별 TTL(초). 장소/이미지 정보는 자주 바뀌지 않지만 블로그·웹 검색 결과는 비교적 빨리 갱신됨
+ENDPOINT_TTLS: Dict[str, int] = {
+    "https://openapi.naver.com/v1/search/local.json": 24 * 3600,
+    "https://openapi.naver.com/v1/search/image": 7 * 24 * 3600,
+    "https://openapi.naver.com/v1/search/blog.json": 6 * 3600,
+    "https://dapi.kakao.com/v2/search/web": 6 * 3600,
+    "https://dapi.kakao.com/v2/local/search/keyword.json": 24 * 3600,
+}
+
+
+def make_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """(엔드포인트, 정규화된 파라미터)로 캐시 키를 생성
+
+    문자열 파라미터는 앞뒤 공백 제거 + 연속 공백을 하나로 합쳐서 "강남역  데이트 맛집"과
+    "강남역 데이트 맛집"이 같은 키가 되도록 한다.
+    """
+    normalized = {
+        k: re.sub(r"\s+", " ", v).strip().lower() if isinstance(v, str) else v
+        for k, v in sorted((params or {}).items())
+    }
+    raw = json.dumps([endpoint, normalized], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def is_empty_response(value: Any) -> bool:
+    """네이버(items)/카카오(documents) 응답에 결과가 하나도 없는지 확인"""
+    if not value:
+        return True
+    if isinstance(value, dict):
+        return not (value.get("items") or value.get("documents"))
+    return False
+
+
+class LRUTier:
+    """프로세스 내 LRU 캐시 (항목별 만료 시각 보관)
+
+    값은 JSON 문자열로 보관하고 꺼낼 때마다 새로 파싱하므로, 호출자가 결과를 수정해도 캐시가 오염되지 않는다.
+    """
+
+    def __init__(self, maxsize: int = API_CACHE_LOCAL_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, raw = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: int):
+        raw = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._data[key] = (time.time() + ttl, raw)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteTier:
+    """여러 워커가 공유하는 SQLite 캐시 계층 (Redis가 없는 환경 및 테스트용)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite 연결은 fork를 넘어 공유하면 안 되므로 프로세스마다 처음 사용할 때 연결
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS api_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, expires_at FROM api_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] < now:
+                # 만료된 행은 읽는 시점에 지워 파일이 계속 커지지 않도록 함
+                conn.execute("DELETE FROM api_cache WHERE key = ? AND expires_at < ?", (key, now))
+                conn.commit()
+                return None
+        if row is None:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: int):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO api_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time() + ttl),
+            )
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM api_cache")
+            conn.commit()
+
+
+class RedisTier:
+    """Redis(또는 호환 서버) 공유 캐시 계층"""
+
+    def __init__(self, url: str, prefix: str = "cureat:api:"):
+        if redis is None:
+            raise RuntimeError("Redis 캐시를 사용하려면 'pip install redis'를 실행해주세요.")
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: int):
+        self._client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=ttl)
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(key)
+
+
+def _open_shared_tier(url: str):
+    if not url:
+        return None
+    try:
+        if url.startswith("sqlite:///"):
+            return SQLiteTier(url[len("sqlite:///"):])
+        if url.startswith(("redis://", "rediss://", "unix://")):
+            return RedisTier(url)
+        logging.warning(f"[API CACHE] 지원하지 않는 공유 캐시 주소: {url}")
+    except Exception as e:
+        logging.warning(f"[API CACHE] 공유 캐시 연결 실패, 로컬 캐시만 사용합니다: {e}")
+    return None
+
+
+class ResponseCache:
+    """외부 검색 API 응답 캐시: 로컬 LRU → 공유 계층 → 실제 호출(single-flight) 순으로 조회"""
+
+    def __init__(self, local: LRUTier, shared=None):
+        self.local = local
+        self.shared = shared
+        self._flight = SingleFlight()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _ttl_for(self, endpoint: str, value: Any) -> int:
+        if is_empty_response(value):
+            return API_CACHE_NEGATIVE_TTL
+        return ENDPOINT_TTLS.get(endpoint, API_CACHE_DEFAULT_TTL)
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        if self.shared is not None:
+            try:
+                value = self.shared.get(key)
+            except Exception as e:
+                logging.warning(f"[API CACHE] 공유 캐시 조회 실패: {e}")
+                return None
+            if value is not None:
+                # 공유 계층에서 찾은 값은 짧게 로컬에도 올려둔다
+                self.local.set(key, value, API_CACHE_NEGATIVE_TTL)
+        return value
+
+    def _store(self, key: str, value: Any, ttl: int):
+        self.local.set(key, value, ttl)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, ttl)
+            except Exception as e:
+                logging.warning(f"[API CACHE] 공유 캐시 저장 실패: {e}")
+
+    def get_or_fetch(self, endpoint: str, params: Dict[str, Any], fetch: Callable[[], Any]) -> Any:
+        """캐시에 있으면 반환하고, 없으면 fetch()를 한 번만 호출하여 결과를 캐시
+
+        fetch()가 예외를 던지면 캐시하지 않고 그대로 전파한다 (일시적 오류를 캐시하지 않기 위함).
+        """
+        key = make_key(endpoint, params)
+        value = self._lookup(key)
+        if value is not None:
+            with self._stats_lock:
+                self.hits += 1
+            return value
+
+        def load():
+            # 선행 호출이 끝나기 직전에 들어온 요청도 캐시된 결과를 쓰도록 다시 확인
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+            with self._stats_lock:
+                self.misses += 1
+            result = fetch()
+            self._store(key, result, self._ttl_for(endpoint, result))
+            return result
+
+        # single-flight로 합쳐진 호출자들은 같은 객체를 받으므로 각자 복사본을 반환
+        return copy.deepcopy(self._flight.do(key, load))
+
+    def clear(self):
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+
+
+response_cache = ResponseCache(LRUTier(), _open_shared_tier(API_CACHE_URL))
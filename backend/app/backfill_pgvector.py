@@ -0,0 +1,49 @@
+"""ChromaDB에 저장된 맛집 벡터를 pgvector(restaurant_embeddings) 테이블로 일괄 복사
+
+실행: python -m backend.app.backfill_pgvector [--chroma-path ./chroma_db_storage] [--batch-size 500]
+이미 있는 ID는 덮어쓰므로 여러 번 실행해도 안전하다.
+"""
+import time
+import logging
+import argparse
+
+from . import models
+from .database import SessionLocal
+from .vector_store import ChromaStore, PgVectorStore
+from .vectorDBService import make_restaurant_id
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _restaurant_links(ids, metadatas) -> dict:
+    # 벡터 저장소 ID와 같은 규칙(make_restaurant_id)으로 restaurants 행을 찾아 연결
+    wanted = set(ids)
+    names = {m.get("name") for m in metadatas if m.get("name")}
+    with SessionLocal() as db:
+        rows = db.query(models.Restaurant.id, models.Restaurant.name, models.Restaurant.address).filter(models.Restaurant.name.in_(names)).all()
+    return {make_restaurant_id(name, address): pk for pk, name, address in rows if make_restaurant_id(name, address) in wanted}
+
+
+def backfill(chroma_path: str, batch_size: int) -> int:
+    source = ChromaStore(chroma_path)
+    target = PgVectorStore()
+    total, started = 0, time.perf_counter()
+    for ids, vectors, metadatas in source.iter_all(batch_size):
+        target.upsert(ids, vectors, metadatas)
+        target.link_restaurants(_restaurant_links(ids, metadatas))
+        total += len(ids)
+        logging.info(f"[BACKFILL] {total}/{source.count()}개 복사 완료")
+    logging.info(f"[BACKFILL] 완료: {total}개, {time.perf_counter() - started:.1f}초")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ChromaDB → pgvector 맛집 임베딩 이전")
+    parser.add_argument("--chroma-path", default="./chroma_db_storage")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    backfill(args.chroma_path, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# ------------------------------
+# 병렬 크롤링 설정 (환경 변수로 조정 가능)
+# ------------------------------
+CRAWL_MAX_WORKERS = int(os.getenv("CRAWL_MAX_WORKERS", "16"))  # 프로세스 전체 I/O 워커 수
+CRAWL_PER_HOST_LIMIT = int(os.getenv("CRAWL_PER_HOST_LIMIT", "4"))  # 호스트별 동시 요청 수
+CRAWL_DEADLINE = float(os.getenv("CRAWL_DEADLINE", "12.0"))  # 맛집 1건 크롤링 전체 제한 시간(초)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """프로세스 전역에서 공유하는 I/O 스레드 풀을 반환 (최초 호출 시 생성)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=CRAWL_MAX_WORKERS, thread_name_prefix="crawl")
+    return _executor
+
+
+class HostLimiter:
+    """호스트(도메인)별 동시 요청 수를 제한하는 세마포어 모음"""
+
+    def __init__(self, per_host: int = CRAWL_PER_HOST_LIMIT):
+        self.per_host = per_host
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            sem = self._semaphores.get(host)
+            if sem is None:
+                sem = self._semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return sem
+
+    @contextmanager
+    def limit(self, url: str):
+        sem = self._semaphore(url)
+        with sem:
+            yield
+
+
+host_limiter = HostLimiter()
+
+
+class Deadline:
+    """여러 단계에 걸쳐 공유되는 전체 제한 시간"""
+
+    def __init__(self, seconds: float = CRAWL_DEADLINE):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def submit(fn: Callable[..., Any], *args, **kwargs) -> Future:
+    """공유 스레드 풀에 작업을 제출"""
+    return get_executor().submit(fn, *args, **kwargs)
+
+
+def result_or(future: Future, deadline: Deadline, default: Any = None) -> Any:
+    """제한 시간 안에 끝난 작업의 결과를 반환, 실패하거나 시간 초과 시 default 반환"""
+    try:
+        return future.result(timeout=deadline.remaining())
+    except Exception as e:
+        future.cancel()
+        logging.warning(f"[CONCURRENCY] 작업 실패 또는 시간 초과: {e!r}")
+        return default
+
+
+def map_with_deadline(fn: Callable[[Any], Any], items: Iterable[Any], deadline: Deadline, default: Any = None) -> List[Any]:
+    """items 각각에 fn을 병렬로 적용하고 입력 순서대로 결과를 반환
+
+    제한 시간 안에 끝나지 않았거나 예외가 발생한 항목은 default로 채움.
+    """
+    futures = [submit(fn, item) for item in items]
+    pending = set(futures)
+    while pending and not deadline.expired:
+        _, pending = wait(pending, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+    for f in pending:
+        f.cancel()
+
+    results = []
+    for f in futures:
+        if f.done() and not f.cancelled() and f.exception() is None:
+            results.append(f.result())
+        else:
+            if f.done() and not f.cancelled():
+                logging.warning(f"[CONCURRENCY] 작업 실패: {f.exception()!r}")
+            results.append(default)
+    return results
+
+
+def iter_completed(fn: Callable[[Any], Any], items: Iterable[Any], deadline: Deadline, window: int = CRAWL_MAX_WORKERS) -> Iterator[Tuple[int, Any]]:
+    """items 각각에 fn을 병렬로 적용하고 끝나는 순서대로 (입력 번호, 결과)를 내보내는 제너레이터
+
+    동시에 실행하는 작업은 window개로 제한하여, 호출자가 중간에 멈추면(break/close) 아직 시작하지 않은 항목은
+    제출조차 하지 않는다. 실패한 항목은 건너뛰고, 제한 시간이 지나면 남은 작업을 취소하고 끝난다.
+    """
+    queue = iter(enumerate(items))
+    running: Dict[Future, int] = {}
+    try:
+        while not deadline.expired:
+            while len(running) < window:
+                entry = next(queue, None)
+                if entry is None:
+                    break
+                running[submit(fn, entry[1])] = entry[0]
+            if not running:
+                return
+            done, _ = wait(running, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+            for f in done:
+                index = running.pop(f)
+                if f.exception() is not None:
+                    logging.warning(f"[CONCURRENCY] 작업 실패: {f.exception()!r}")
+                    continue
+                yield index, f.result()
+    finally:
+        for f in running:
+            f.cancel()
@@ -1,14 +1,13 @@
-import requests
 import json
 import os
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
-from readability import Document
 import google.generativeai as genai
 
+from . import html_extract, http_client, llm_cache
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -23,12 +22,29 @@ model = genai.GenerativeModel('gemini-1.5-flash')
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# 분석 프롬프트를 바꾸면 버전을 올려야 예전 응답이 LLM 캐시에서 재사용되지 않음
+ANALYSIS_PROMPT_VERSION = "crawler-analysis-v1"
+
+
+def _extract_json_object(text: str) -> Dict[str, Any]:
+    """응답 텍스트에서 첫 '{'부터 마지막 '}'까지를 JSON으로 파싱 (실패 시 빈 dict)"""
+    start, end = text.find('{'), text.rfind('}') + 1
+    if start == -1 or end == 0:
+        return {}
+    try:
+        return json.loads(text[start:end])
+    except json.JSONDecodeError:
+        return {}
+
+
 class RestaurantCrawler:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        # 커넥션 풀은 프로세스 전역 세션을 공유하고, User-Agent는 요청마다 붙인다
+        # (공유 세션의 기본 헤더를 바꾸면 다른 서비스 호출에도 적용되므로)
+        self.session = http_client.get_session()
+        self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        })
+        }
         
     def kakao_search_local(self, query: str, size: int = 10) -> List[Dict[str, Any]]:
         """카카오 지역 검색 API로 맛집 검색"""
@@ -37,7 +53,7 @@ class RestaurantCrawler:
             return []
             
         url = "https://dapi.kakao.com/v2/search/local.json"
-        headers = {"Authorization": f"KakaoAK {KAKAO_REST_KEY}"}
+        headers = {**self.headers, "Authorization": f"KakaoAK {KAKAO_REST_KEY}"}
         params = {
             "query": query,
             "size": size
@@ -63,7 +79,7 @@ class RestaurantCrawler:
             return []
             
         url = "https://dapi.kakao.com/v2/search/web"
-        headers = {"Authorization": f"KakaoAK {KAKAO_REST_KEY}"}
+        headers = {**self.headers, "Authorization": f"KakaoAK {KAKAO_REST_KEY}"}
         params = {
             "query": f"{query} 리뷰 맛집",
             "size": size
@@ -86,12 +102,10 @@ class RestaurantCrawler:
     def fetch_page_content(self, url: str) -> str:
         """웹페이지 내용 크롤링"""
         try:
-            response = self.session.get(url, timeout=10)
+            response = self.session.get(url, headers=self.headers, timeout=10)
             if response.status_code == 200:
-                # Readability로 본문 추출
-                doc = Document(response.text)
-                soup = BeautifulSoup(doc.summary(), 'html.parser')
-                text = soup.get_text()
+                # Readability로 본문 추출 (큰 페이지는 별도 프로세스에서 처리)
+                text = html_extract.extract(response.text, separator="")
                 # 텍스트 정제
                 lines = [line.strip() for line in text.split('\n') if line.strip()]
                 clean_text = '\n'.join(lines)
@@ -185,17 +199,12 @@ JSON 형식으로만 답변해주세요.
 """
         
         try:
-            response = model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # JSON 추출
-            start = response_text.find('{')
-            end = response_text.rfind('}') + 1
-            if start != -1 and end != 0:
-                json_str = response_text[start:end]
-                analysis = json.loads(json_str)
-                logging.info(f"Gemini 분석 완료: {restaurant_name}")
-                return analysis
+            # 같은 맛집/리뷰로 다시 분석하면 LLM을 호출하지 않고 저장된 결과를 사용
+            inputs = {"name": restaurant_name, "reviews": reviews}
+            completion = llm_cache.llm_cache.generate(model, ANALYSIS_PROMPT_VERSION, inputs, prompt, parse=_extract_json_object)
+            if completion.parsed:
+                logging.info(f"Gemini 분석 완료{' (캐시)' if completion.hit else ''}: {restaurant_name}")
+                return completion.parsed
             else:
                 logging.warning("Gemini 응답에서 JSON을 찾을 수 없습니다.")
                 return {}
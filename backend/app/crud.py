@@ -1,9 +1,9 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import update
+from sqlalchemy import update, func
 from backend import db
-from . import models, schemas
+from . import models, schemas, snippet_classifier
 from passlib.context import CryptContext
-from datetime import date
+from datetime import date, datetime, timedelta, timezone
 from typing import List, Optional, Dict, Any
 from passlib.context import CryptContext
 
@@ -59,7 +59,7 @@ def get_or_create_restaurant_in_postgres(db: Session, name: str, address: str, i
     DB에 맛집이 있으면 정보를 가져오고, 없으면 새로 생성
     이름과 주소를 기준으로 중복 확인
     """
-    restaurant = db.query(models.Restaurant).filter_by(name==name, address==address, image_url==image_url).first()
+    restaurant = db.query(models.Restaurant).filter_by(name=name, address=address).first()
     if restaurant:
         return restaurant
     
@@ -69,10 +69,27 @@ def get_or_create_restaurant_in_postgres(db: Session, name: str, address: str, i
     db.refresh(db_restaurant)
     return db_restaurant
 
+def search_similar_restaurants(db: Session, vector: List[float], n_results: int = 3, region: Optional[str] = None,
+                               category: Optional[str] = None, price_range: Optional[str] = None,
+                               min_trust_score: Optional[int] = None) -> List[models.RestaurantEmbedding]:
+    """
+    임베딩 k-NN(HNSW 인덱스, 코사인 거리)과 지역/카테고리/가격대/신뢰도 필터를 SQL 한 문장으로 조회
+    """
+    query = db.query(models.RestaurantEmbedding)
+    if region:
+        query = query.filter(models.RestaurantEmbedding.region.like(f"{region}%"))
+    if category:
+        query = query.filter(models.RestaurantEmbedding.category == category)
+    if price_range:
+        query = query.filter(models.RestaurantEmbedding.price_range.contains(price_range))
+    if min_trust_score is not None:
+        query = query.filter(models.RestaurantEmbedding.review_trust_score >= min_trust_score)
+    return query.order_by(models.RestaurantEmbedding.embedding.cosine_distance(vector)).limit(n_results).all()
+
 # 리뷰 & 검색로그 CRUD 함수
 def create_review(db: Session, review: schemas.ReviewCreate):
-    """새로운 리뷰를 생성"""
-    db_review = models.Review(**review.dict())
+    """새로운 리뷰를 생성 (광고/협찬 표시 문구가 있으면 광고성 리뷰로 표시)"""
+    db_review = models.Review(**review.dict(), is_ad=snippet_classifier.is_ad_text(review.content))
     db.add(db_review)
     db.commit()
     db.refresh(db_review)
@@ -84,4 +101,17 @@ def create_search_log(db: Session, user_id: int, query: str):
     db.add(db_log)
     db.commit()
     db.refresh(db_log)
-    return db_log
\ No newline at end of file
+    return db_log
+
+def get_top_search_queries(db: Session, limit: int = 20, days: int = 30) -> List[str]:
+    """최근 days일 동안 가장 많이 검색된 검색어 상위 limit개 (사전 크롤링 대상 선정용)"""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = (
+        db.query(models.SearchLog.query, func.count(models.SearchLog.id).label("cnt"))
+        .filter(models.SearchLog.timestamp >= since)
+        .group_by(models.SearchLog.query)
+        .order_by(func.count(models.SearchLog.id).desc())
+        .limit(limit)
+        .all()
+    )
+    return [row.query for row in rows]
@@ -1,8 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
-import chromadb
 
 # PostgreSQL 연결 URL (환경 변수에서 불러옴)
 SQLALCHEMY_DATABASE_URL = os.getenv(
@@ -22,11 +21,7 @@ def get_db():
     finally:
         db.close()
 
-# Vector DB 설정 (ChromaDB)
-vector_db_client = chromadb.PersistentClient(path="./chroma_db_storage")
-# restaurants 컬렉션 가져오기 (없으면 생성)
-restaurant_collection = vector_db_client.get_or_create_collection(name="restaurants")
-
-def get_vector_db_collection():
-    # 벡터 DB의 restaurants 컬렉션을 반환
-    return restaurant_collection
\ No newline at end of file
+def enable_pgvector(bind=engine):
+    # 벡터 컬럼을 가진 테이블을 만들기 전에 pgvector 확장을 활성화
+    with bind.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
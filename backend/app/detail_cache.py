@@ -0,0 +1,79 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# ------------------------------
+# 맛집 상세 정보 캐시 설정 (환경 변수로 조정 가능)
+# ------------------------------
+DETAIL_CACHE_SIZE = int(os.getenv("DETAIL_CACHE_SIZE", "1024"))  # 메모리에 보관할 맛집 수
+DETAIL_CACHE_TTL = int(os.getenv("DETAIL_CACHE_TTL", "3600"))  # 이 시간이 지나면 벡터 저장소에서 다시 읽음(초)
+
+
+class DetailCache:
+    """맛집 ID → 디코딩이 끝난 상세 정보 dict를 보관하는 프로세스 내 LRU 캐시 (TTL 적용)
+
+    벡터 저장소 조회와 메타데이터 디코딩을 건너뛰기 위한 계층으로, 저장소에 쓸 때 함께 갱신된다(write-through).
+    """
+
+    def __init__(self, maxsize: int = DETAIL_CACHE_SIZE, ttl: int = DETAIL_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, restaurant_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(restaurant_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, detail = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[restaurant_id]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(restaurant_id)
+            self.hits += 1
+        # 호출자가 결과를 수정해도 캐시 원본이 바뀌지 않도록 얕은 복사본을 반환
+        return dict(detail)
+
+    def put(self, restaurant_id: str, detail: Dict[str, Any]):
+        with self._lock:
+            self._data[restaurant_id] = (time.monotonic(), dict(detail))
+            self._data.move_to_end(restaurant_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, restaurant_id: str):
+        with self._lock:
+            self._data.pop(restaurant_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 크기 조정용 지표"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+detail_cache = DetailCache()
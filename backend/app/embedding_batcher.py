@@ -0,0 +1,146 @@
+import time
+import queue
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+def _deliver(future: Future, result: Any = None, error: Optional[BaseException] = None):
+    # 호출자가 기다리다 포기(cancel)한 요청이면 결과를 버림
+    if not future.set_running_or_notify_cancel():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def _deliver_from(future: Future, done: Future):
+    if done.cancelled():
+        future.cancel()
+    elif done.exception() is not None:
+        _deliver(future, error=done.exception())
+    else:
+        _deliver(future, done.result())
+
+
+class MicroBatcher:
+    """동시에 들어온 임베딩 요청을 잠깐 모아서 한 번의 배치 forward로 처리하는 계층
+
+    각 호출자는 submit()으로 Future를 받고, 백그라운드 스레드가 최대 max_wait_ms 동안
+    (또는 max_batch_size개가 찰 때까지) 요청을 모아 encode_fn(texts)을 한 번 호출한 뒤
+    결과 행을 호출자별로 나눠준다.
+
+    workers > 1이면 모은 배치를 별도 스레드 풀에서 처리하여, 한 배치가 오래 걸려도(LLM 호출 등) 다음 배치를 계속 모은다.
+    encode_fn이 돌려준 행이 Future이면 그 작업이 끝나는 대로 해당 호출자에게만 전달한다 (다른 호출자는 기다리지 않음).
+    call()은 묶지 않을 작업(단건 요청, 배치에서 빠진 항목 재요청 등)을 같은 작업자 스레드 풀에서 실행한다.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[Any]], Any], max_batch_size: int = 32, max_wait_ms: float = 5.0,
+                 name: str = "embedding-batcher", workers: int = 1):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.workers = workers
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._max_queue_depth = 0
+        self._batch_sizes: Counter = Counter()
+        self._encode_seconds = 0.0
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    if self._pool is None:
+                        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((item, future))
+        with self._metrics_lock:
+            self._requests += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        return future
+
+    def call(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """배치로 묶지 않고 이 배처의 작업자 스레드 풀에서 fn(*args)를 실행"""
+        self._ensure_started()
+        return self._pool.submit(fn, *args)
+
+    def encode(self, texts: List[str], timeout: Optional[float] = None) -> List[Any]:
+        """여러 텍스트를 제출하고 입력 순서대로 결과 행을 반환"""
+        futures = [self.submit(text) for text in texts]
+        return [f.result(timeout=timeout) for f in futures]
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if self.workers > 1:
+                self._pool.submit(self._process, batch)
+            else:
+                self._process(batch)
+
+    def _process(self, batch: List[tuple]):
+        items = [item for item, _ in batch]
+        started = time.monotonic()
+        try:
+            rows = self.encode_fn(items)
+        except Exception as e:
+            logging.warning(f"[BATCH:{self.name}] 배치 처리 실패 ({len(items)}건): {e}")
+            with self._metrics_lock:
+                self._errors += 1
+            for _, future in batch:
+                _deliver(future, error=e)
+            return
+        with self._metrics_lock:
+            self._batches += 1
+            self._batch_sizes[len(batch)] += 1
+            self._encode_seconds += time.monotonic() - started
+        for (_, future), row in zip(batch, rows):
+            if isinstance(row, Future):
+                row.add_done_callback(lambda done, future=future: _deliver_from(future, done))
+            else:
+                _deliver(future, row)
+
+    def metrics(self) -> Dict[str, Any]:
+        """처리량/지연 튜닝용 지표 (현재 큐 길이, 배치 크기 분포 등)"""
+        with self._metrics_lock:
+            total_items = sum(size * count for size, count in self._batch_sizes.items())
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "requests": self._requests,
+                "batches": self._batches,
+                "errors": self._errors,
+                "avg_batch_size": round(total_items / self._batches, 2) if self._batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+                "avg_encode_ms": round(self._encode_seconds / self._batches * 1000, 2) if self._batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+            }
@@ -0,0 +1,138 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# ------------------------------
+# 맛집 상세 정보 신선도 설정 (환경 변수로 조정 가능)
+# ------------------------------
+DETAIL_SCHEMA_VERSION = 1  # 저장하는 상세 정보 형식(요약 필드 구성 등)을 바꾸면 올림 → 예전 기록은 stale로 취급
+DETAIL_FRESH_TTL = int(os.getenv("DETAIL_FRESH_TTL", str(7 * 24 * 3600)))  # 이 시간까지는 그대로 사용(초)
+DETAIL_MAX_STALENESS = int(os.getenv("DETAIL_MAX_STALENESS", str(30 * 24 * 3600)))  # 이보다 오래되면 응답 전에 다시 수집(초)
+DETAIL_REFRESH_WORKERS = int(os.getenv("DETAIL_REFRESH_WORKERS", "2"))  # 백그라운드 재수집 동시 실행 수
+DETAIL_REFRESH_BACKOFF = int(os.getenv("DETAIL_REFRESH_BACKOFF", "3600"))  # 재수집에 실패한 맛집은 이 시간 동안 다시 시도하지 않음(초)
+
+FRESH = "fresh"
+STALE = "stale"  # 바로 반환하고 백그라운드에서 재수집
+EXPIRED = "expired"  # 재수집이 끝날 때까지 기다림
+
+
+def source_hash(snippets: List[str]) -> str:
+    """크롤링한 리뷰 스니펫 집합의 해시 (순서와 무관, 재수집 결과가 같으면 LLM 요약을 다시 하지 않는 데 사용)"""
+    digest = hashlib.sha1()
+    for snippet in sorted(set(snippets)):
+        digest.update(snippet.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def stamp(metadata: Dict[str, Any], snippets: List[str]) -> Dict[str, Any]:
+    """상세 정보에 수집 시각/원본 해시/형식 버전을 기록"""
+    metadata["crawled_at"] = time.time()
+    metadata["source_hash"] = source_hash(snippets)
+    metadata["schema_version"] = DETAIL_SCHEMA_VERSION
+    return metadata
+
+
+def state(metadata: Dict[str, Any], now: Optional[float] = None) -> str:
+    """상세 정보의 신선도: fresh / stale / expired
+
+    신선도 정보가 없는 예전 기록은 한꺼번에 동기 재수집이 몰리지 않도록 stale로 취급한다.
+    """
+    crawled_at = metadata.get("crawled_at")
+    if not isinstance(crawled_at, (int, float)):
+        return STALE
+    age = (now or time.time()) - crawled_at
+    if age > DETAIL_MAX_STALENESS:
+        return EXPIRED
+    if age > DETAIL_FRESH_TTL or metadata.get("schema_version") != DETAIL_SCHEMA_VERSION:
+        return STALE
+    return FRESH
+
+
+class RefreshScheduler:
+    """맛집 ID마다 최대 하나의 백그라운드 재수집만 실행되도록 관리
+
+    재수집에 실패한 ID는 backoff초 동안 다시 예약하지 않는다 (stale 상태가 그대로라 요청마다 크롤링/LLM 호출이 반복되지 않도록).
+    """
+
+    def __init__(self, workers: int = DETAIL_REFRESH_WORKERS, backoff: int = DETAIL_REFRESH_BACKOFF):
+        self.workers = workers
+        self.backoff = backoff
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Set[str] = set()
+        self._failed_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.counts = {FRESH: 0, STALE: 0, EXPIRED: 0, "refresh_queued": 0, "refresh_done": 0, "refresh_failed": 0,
+                       "refresh_coalesced": 0, "refresh_backoff": 0, "summary_reused": 0, "summary_empty": 0}
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="refresh")
+        return self._pool
+
+    def count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _backing_off_locked(self, restaurant_id: str, now: float) -> bool:
+        failed_at = self._failed_at.get(restaurant_id)
+        if failed_at is None:
+            return False
+        if now - failed_at >= self.backoff:
+            del self._failed_at[restaurant_id]
+            return False
+        return True
+
+    def backing_off(self, restaurant_id: str) -> bool:
+        """최근에 재수집이 실패하여 아직 다시 시도하지 않을 ID인지 여부"""
+        with self._lock:
+            return self._backing_off_locked(restaurant_id, time.time())
+
+    def record_result(self, restaurant_id: str, ok: bool):
+        """재수집 결과를 기록 (실패하면 backoff 시작, 성공하면 해제)"""
+        with self._lock:
+            if ok:
+                self._failed_at.pop(restaurant_id, None)
+            else:
+                self._failed_at[restaurant_id] = time.time()
+            self.counts["refresh_done" if ok else "refresh_failed"] += 1
+
+    def schedule(self, restaurant_id: str, refresh: Callable[[], Any]) -> bool:
+        """재수집을 예약 (같은 ID의 재수집이 이미 진행 중이거나 최근에 실패했으면 False)"""
+        with self._lock:
+            if restaurant_id in self._in_flight:
+                self.counts["refresh_coalesced"] += 1
+                return False
+            if self._backing_off_locked(restaurant_id, time.time()):
+                self.counts["refresh_backoff"] += 1
+                return False
+            self._in_flight.add(restaurant_id)
+            self.counts["refresh_queued"] += 1
+
+        def run():
+            try:
+                ok = refresh() is not None
+            except Exception as e:
+                logging.warning(f"[REFRESH] '{restaurant_id}' 재수집 실패: {e}")
+                ok = False
+            finally:
+                with self._lock:
+                    self._in_flight.discard(restaurant_id)
+            self.record_result(restaurant_id, ok)
+
+        self._executor().submit(run)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counts, "in_flight": len(self._in_flight), "backing_off": len(self._failed_at), "fresh_ttl": DETAIL_FRESH_TTL,
+                    "max_staleness": DETAIL_MAX_STALENESS, "schema_version": DETAIL_SCHEMA_VERSION}
+
+
+refresh_scheduler = RefreshScheduler()
@@ -0,0 +1,108 @@
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+# ------------------------------
+# HTML 본문 추출 설정 (환경 변수로 조정 가능)
+# ------------------------------
+# readability 본문 추출과 HTML 파싱은 CPU를 쓰면서 GIL을 잡고 있으므로 별도 프로세스에서 실행한다.
+HTML_EXTRACT_WORKERS = int(os.getenv("HTML_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0이면 요청 스레드에서 바로 처리
+HTML_EXTRACT_MIN_BYTES = int(os.getenv("HTML_EXTRACT_MIN_BYTES", "20000"))  # 이보다 작은 페이지는 프로세스 간 전송 비용이 더 커서 바로 처리
+HTML_EXTRACT_TIMEOUT = float(os.getenv("HTML_EXTRACT_TIMEOUT", "10.0"))  # 페이지 1개 추출 제한 시간(초)
+# html.parser: 기존과 동일 (순수 Python), lxml: C 기반 BeautifulSoup 파서, selectolax: lexbor 기반 파서 (가장 빠름)
+HTML_PARSER = os.getenv("HTML_PARSER", "html.parser")
+PARSERS = ("html.parser", "lxml", "selectolax")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_lock = threading.Lock()
+
+
+class ParserUnavailable(RuntimeError):
+    """설정한 HTML 파서가 설치되어 있지 않음 (페이지 내용과 무관한 설정 오류이므로 빈 문자열로 삼키지 않음)"""
+
+
+def _html_to_text(html: str, parser: str, separator: str) -> str:
+    if parser == "selectolax":
+        try:
+            from selectolax.parser import HTMLParser
+        except ImportError:
+            raise ParserUnavailable("selectolax 파서를 사용하려면 'pip install selectolax'를 실행해주세요.")
+        tree = HTMLParser(html)
+        root = tree.body or tree.root
+        return root.text(separator=separator) if root is not None else ""
+    from bs4 import BeautifulSoup, FeatureNotFound
+    try:
+        soup = BeautifulSoup(html, parser)
+    except FeatureNotFound:
+        raise ParserUnavailable(f"{parser} 파서를 사용하려면 'pip install {parser}'를 실행해주세요.")
+    return soup.get_text(separator=separator)
+
+
+def extract_main_text(html: str, parser: str = HTML_PARSER, separator: str = "\n") -> str:
+    """readability로 본문 영역을 골라낸 뒤 텍스트만 추출 (실패 시 빈 문자열, 파서가 없으면 ParserUnavailable)"""
+    if parser not in PARSERS:
+        raise ValueError(f"지원하지 않는 HTML 파서입니다: {parser} (가능: {', '.join(PARSERS)})")
+    try:
+        from readability import Document
+        return _html_to_text(Document(html).summary(), parser, separator).strip()
+    except ParserUnavailable:
+        raise
+    except Exception:
+        # 너무 깊게 중첩된 페이지의 RecursionError 등 페이지 자체의 문제
+        return ""
+
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """현재 프로세스의 추출용 프로세스 풀 (HTML_EXTRACT_WORKERS=0이면 None)"""
+    global _pool, _pool_pid
+    if HTML_EXTRACT_WORKERS <= 0:
+        return None
+    if _pool is None or _pool_pid != os.getpid():
+        with _lock:
+            if _pool is None or _pool_pid != os.getpid():
+                # 스레드가 여럿인 서버 프로세스를 fork하면 잠금 상태가 복제될 수 있으므로 spawn으로 새 인터프리터를 띄움
+                _pool = ProcessPoolExecutor(max_workers=HTML_EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def extract(html: str, parser: str = HTML_PARSER, separator: str = "\n") -> str:
+    """HTML에서 본문 텍스트를 추출 (큰 페이지는 프로세스 풀에서 처리, 풀 오류 시 현재 스레드에서 처리)
+
+    제한 시간을 넘긴 페이지는 현재 스레드에서 다시 시도하지 않고 빈 문자열을 반환한다 (같은 작업을 두 번 하지 않도록).
+    """
+    if not html:
+        return ""
+    pool = get_pool() if len(html) >= HTML_EXTRACT_MIN_BYTES else None
+    if pool is None:
+        return extract_main_text(html, parser, separator)
+    future = pool.submit(extract_main_text, html, parser, separator)
+    try:
+        return future.result(timeout=HTML_EXTRACT_TIMEOUT)
+    except FutureTimeoutError:
+        # 이미 실행 중인 작업은 취소되지 않지만, 아직 대기 중이면 풀에서 빠짐
+        future.cancel()
+        logging.warning(f"[HTML] 본문 추출 시간 초과({HTML_EXTRACT_TIMEOUT}초), 페이지를 건너뜁니다.")
+        return ""
+    except ParserUnavailable:
+        raise
+    except BrokenProcessPool:
+        logging.warning("[HTML] 추출 프로세스 풀이 중단되어 다시 생성합니다.")
+        shutdown(wait=False)
+    except Exception as e:
+        logging.warning(f"[HTML] 프로세스 풀 추출 실패: {e!r}")
+    return extract_main_text(html, parser, separator)
+
+
+def shutdown(wait: bool = True):
+    """애플리케이션 종료 시 추출 프로세스 풀을 정리"""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is not None and _pool_pid == os.getpid():
+        pool.shutdown(wait=wait, cancel_futures=True)
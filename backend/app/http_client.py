@@ -0,0 +1,212 @@
+import os
+import re
+import asyncio
+import threading
+from typing import Any, Dict, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx  # 비동기 클라이언트용 (선택 의존성)
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401  httpx의 HTTP/2 지원에 필요 (선택 의존성)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# ------------------------------
+# 커넥션 풀 설정 (환경 변수로 조정 가능)
+# ------------------------------
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "32"))  # 커넥션 풀을 유지할 호스트 수
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "10"))  # 호스트별 최대 커넥션 수
+HTTP_MAX_RETRY = int(os.getenv("HTTP_MAX_RETRY", "2"))  # 연결 오류/5xx 재시도 횟수
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30.0"))  # 비동기 클라이언트의 유휴 커넥션 유지 시간(초)
+RETRY_STATUSES = (502, 503, 504)  # 동기/비동기 클라이언트가 다시 시도하는 응답 코드
+RETRY_METHODS = frozenset({"GET", "HEAD"})
+RETRY_BACKOFF = 0.2
+
+# ------------------------------
+# 크롤링 페이지 다운로드 제한 (환경 변수로 조정 가능)
+# ------------------------------
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(2 * 1024 * 1024)))  # 페이지 1개에서 읽을 최대 바이트 (초과분은 잘라냄)
+FETCH_CHUNK_SIZE = int(os.getenv("FETCH_CHUNK_SIZE", "65536"))
+FETCH_ALLOWED_TYPES = ("text/html", "application/xhtml+xml", "text/plain")  # 이 외의 Content-Type(이미지/PDF 등)은 받지 않음
+
+_session: Optional[requests.Session] = None
+_async_client = None
+_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=HTTP_MAX_RETRY,
+        connect=HTTP_MAX_RETRY,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        raise_on_status=False,
+    )
+    # pool_block=True: 호스트별 커넥션 수가 한도에 도달하면 새 연결을 만들지 않고 대기
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_PER_HOST, max_retries=retry, pool_block=True)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """프로세스 전역에서 공유하는 keep-alive 동기 HTTP 세션을 반환
+
+    urllib3 커넥션 풀은 스레드 안전하므로 모든 워커 스레드가 같은 세션을 재사용하여
+    네이버/카카오 API 호스트에 대한 TCP+TLS 핸드셰이크를 줄인다.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def _build_async_client():
+    class RetryTransport(httpx.AsyncHTTPTransport):
+        """연결 오류는 httpx가, 5xx(RETRY_STATUSES)는 여기서 동기 세션과 같은 횟수/백오프로 다시 시도"""
+
+        async def handle_async_request(self, request):
+            response = await super().handle_async_request(request)
+            for attempt in range(HTTP_MAX_RETRY):
+                if request.method not in RETRY_METHODS or response.status_code not in RETRY_STATUSES:
+                    break
+                await response.aclose()
+                await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+                response = await super().handle_async_request(request)
+            return response
+
+    # 동기 세션과 같은 총량의 커넥션을 유지 (httpx는 호스트별 한도가 없으므로 전체 한도로 맞춤)
+    limits = httpx.Limits(
+        max_connections=HTTP_POOL_HOSTS * HTTP_POOL_PER_HOST,
+        max_keepalive_connections=HTTP_POOL_HOSTS * HTTP_POOL_PER_HOST,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    transport = RetryTransport(retries=HTTP_MAX_RETRY, http2=HTTP2_AVAILABLE, limits=limits)
+    return httpx.AsyncClient(transport=transport)
+
+
+def get_async_client():
+    """프로세스 전역에서 공유하는 비동기 HTTP 클라이언트 (httpx, h2가 설치되어 있으면 HTTP/2)"""
+    global _async_client
+    if httpx is None:
+        raise RuntimeError("비동기 HTTP 클라이언트를 사용하려면 'pip install httpx[http2]'를 실행해주세요.")
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                _async_client = _build_async_client()
+    return _async_client
+
+
+def close():
+    """애플리케이션 종료 시 동기 세션의 커넥션을 정리 (비동기 클라이언트는 aclose()로 정리)"""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+async def aclose():
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is not None:
+        await client.aclose()
+
+
+class FetchRejected(Exception):
+    """Content-Type이나 Content-Length 때문에 본문을 받지 않은 경우"""
+
+
+class CappedResponse(NamedTuple):
+    status_code: int
+    headers: Any
+    text: str
+    truncated: bool
+
+
+_fetch_stats = {"fetched": 0, "not_modified": 0, "truncated": 0, "rejected_type": 0, "rejected_length": 0, "bytes": 0}
+_fetch_stats_lock = threading.Lock()
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([A-Za-z0-9_-]+)""", re.IGNORECASE)
+
+
+def _count(**increments: int):
+    with _fetch_stats_lock:
+        for key, value in increments.items():
+            _fetch_stats[key] += value
+
+
+def _detect_charset(content_type: str, first_chunk: bytes) -> str:
+    # 헤더에 charset이 없으면 첫 청크의 <meta charset>만 확인 (본문 전체를 추측하지 않음)
+    match = re.search(r"charset=([\w-]+)", content_type, re.IGNORECASE)
+    if match:
+        return match.group(1)
+    match = _META_CHARSET.search(first_chunk)
+    return match.group(1).decode("ascii") if match else "utf-8"
+
+
+def get_capped(url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+               timeout: float = 5.0, max_bytes: int = FETCH_MAX_BYTES, check_type: bool = True) -> CappedResponse:
+    """본문을 스트리밍으로 받아 max_bytes에서 잘라 반환
+
+    Content-Type이 HTML/텍스트가 아니거나 Content-Length가 한도를 넘으면 본문을 받기 전에 FetchRejected를 던진다.
+    304 응답은 본문 없이 반환하고, 그 외 4xx/5xx는 requests.HTTPError를 던진다.
+    """
+    with get_session().get(url, params=params, headers=headers, timeout=timeout, stream=True) as r:
+        if r.status_code == 304:
+            _count(not_modified=1)
+            return CappedResponse(304, r.headers, "", False)
+        r.raise_for_status()
+        content_type = r.headers.get("Content-Type", "")
+        if check_type and content_type and content_type.split(";")[0].strip().lower() not in FETCH_ALLOWED_TYPES:
+            _count(rejected_type=1)
+            raise FetchRejected(f"Content-Type {content_type}: {url}")
+        length = r.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > max_bytes:
+            _count(rejected_length=1)
+            raise FetchRejected(f"Content-Length {length} > {max_bytes}: {url}")
+
+        chunks, size, truncated = [], 0, False
+        for chunk in r.iter_content(chunk_size=FETCH_CHUNK_SIZE):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size > max_bytes:
+                truncated = True
+                break
+        body = b"".join(chunks)[:max_bytes]
+        charset = _detect_charset(content_type, chunks[0] if chunks else b"")
+        _count(fetched=1, truncated=int(truncated), bytes=len(body))
+        try:
+            text = body.decode(charset, errors="replace")
+        except LookupError:
+            text = body.decode("utf-8", errors="replace")
+        return CappedResponse(r.status_code, r.headers, text, truncated)
+
+
+def fetch_metrics() -> Dict[str, int]:
+    """크롤링 페이지 다운로드 횟수와 잘림/거부 횟수"""
+    with _fetch_stats_lock:
+        return dict(_fetch_stats)
+
+
+def _reset_after_fork():
+    # fork된 자식 프로세스는 부모의 소켓을 공유하면 안 되므로 풀을 새로 만든다
+    global _session, _async_client, _lock
+    _session = None
+    _async_client = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
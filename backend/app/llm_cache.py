@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, NamedTuple, Optional
+
+from .singleflight import SingleFlight
+
+# ------------------------------
+# LLM 응답 캐시 설정 (환경 변수로 조정 가능)
+# ------------------------------
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "./llm_cache.db")
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 초과하면 오래 안 쓴 응답부터 삭제
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))  # 이 시간이 지난 응답은 다시 생성(초), 0이면 만료 없음
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+
+
+class CachedCompletion(NamedTuple):
+    raw: str  # 모델이 돌려준 원문
+    parsed: Any  # 원문을 파싱한 결과 (캐시 적중 시 다시 파싱하지 않음)
+    hit: bool
+
+
+def _normalize(value: Any) -> Any:
+    # 공백 차이만 있는 입력은 같은 키가 되도록 문자열의 연속 공백을 하나로 합침
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_key(model_name: str, template_version: str, inputs: Any) -> str:
+    """(모델 이름, 프롬프트 템플릿 버전, 정규화한 입력) → 캐시 키"""
+    payload = json.dumps([model_name, template_version, _normalize(inputs)], ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def model_name_of(model: Any) -> str:
+    return getattr(model, "model_name", None) or type(model).__name__
+
+
+class LLMCache:
+    """LLM 응답을 디스크(SQLite)에 저장하는 캐시 (전체 크기가 한도를 넘으면 오래 안 쓴 항목부터 삭제)"""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES, ttl: int = LLM_CACHE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite 연결은 fork를 넘어 공유하면 안 되므로 프로세스마다 처음 사용할 때 연결
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS llm_responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    template_version TEXT NOT NULL,
+                    raw TEXT NOT NULL,
+                    parsed TEXT,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_llm_responses_used_at ON llm_responses (used_at);
+            """)
+            self._conn.commit()
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[CachedCompletion]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT raw, parsed, created_at FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (self.ttl and time.time() - row[2] > self.ttl):
+                self.misses += 1
+                return None
+            conn.execute("UPDATE llm_responses SET used_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.hits += 1
+        raw, parsed, _ = row
+        return CachedCompletion(raw, json.loads(parsed) if parsed is not None else None, True)
+
+    def put(self, key: str, model_name: str, template_version: str, raw: str, parsed: Any = None):
+        parsed_json = json.dumps(parsed, ensure_ascii=False) if parsed is not None else None
+        size = len(raw.encode("utf-8")) + len((parsed_json or "").encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, model, template_version, raw, parsed, size, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model_name, template_version, raw, parsed_json, size, now, now),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 한도의 90%까지 줄여서 매번 삭제가 일어나지 않도록 함
+        target = int(self.max_bytes * 0.9)
+        removed = []
+        for key, size in conn.execute("SELECT key, size FROM llm_responses ORDER BY used_at"):
+            if total <= target:
+                break
+            removed.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM llm_responses WHERE key = ?", removed)
+        logging.info(f"[LLM_CACHE] 크기 한도 초과로 {len(removed)}개 응답 삭제")
+
+    def generate(self, model: Any, template_version: str, inputs: Any, prompt: str,
+                 parse: Optional[Callable[[str], Any]] = None) -> CachedCompletion:
+        """캐시에 있으면 저장된 응답을, 없으면 model.generate_content(prompt)를 호출해 저장 후 반환
+
+        parse가 빈 값을 돌려준 응답(형식이 깨진 응답)은 저장하지 않아 다음 호출에서 다시 생성한다.
+        같은 키로 동시에 들어온 호출은 한 번만 생성한다.
+        """
+        model_name = model_name_of(model)
+        key = make_key(model_name, template_version, inputs)
+        if LLM_CACHE_ENABLED:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+        def fetch() -> CachedCompletion:
+            raw = getattr(model.generate_content(prompt), "text", "") or ""
+            parsed = parse(raw) if parse else None
+            if LLM_CACHE_ENABLED and raw and (parse is None or parsed):
+                self.put(key, model_name, template_version, raw, parsed)
+            return CachedCompletion(raw, parsed, False)
+
+        return self._flight.do(key, fetch)
+
+    def stats(self):
+        with self._lock:
+            conn = self._connection()
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": count,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+llm_cache = LLMCache()
@@ -1,18 +1,51 @@
-from fastapi import FastAPI, Depends, HTTPException
+import json
+from typing import Any, Dict, Iterator
+from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from . import crud, models, schemas, service
+from . import crud, models, schemas, service, http_client, nlpService, warmup, vectorDBService, html_extract, llm_cache, prewarm, freshness
 from .database import engine, get_db
 
-# 애플리케이션 시작 시, PostgreSQL에 테이블들을 생성합니다.
-models.Base.metadata.create_all(bind=engine)
+# preload 모드(gunicorn --preload)에서는 워커를 fork하기 전에 모델 가중치를 미리 로드합니다.
+if warmup.CUREAT_PRELOAD:
+    warmup.preload_shared()
 
 app = FastAPI(title="Cureat API", description="AI 기반 맛집 추천 및 코스 생성 서비스")
 
+@app.on_event("startup")
+def startup_event():
+    # 애플리케이션 시작 시, PostgreSQL에 테이블들을 생성합니다.
+    # restaurant_embeddings(pgvector)는 VECTOR_STORE_BACKEND=pgvector일 때 PgVectorStore가 확장과 함께 만듭니다.
+    tables = [t for t in models.Base.metadata.sorted_tables if t is not models.RestaurantEmbedding.__table__]
+    models.Base.metadata.create_all(bind=engine, tables=tables)
+    warmup.mark_database_ready()
+    # 모델/Okt/벡터 DB는 요청 처리를 막지 않도록 백그라운드에서 로드합니다.
+    if warmup.WARMUP_ON_STARTUP:
+        warmup.start_background_warmup()
+    # 인기 지역/검색어의 맛집을 미리 크롤링해 두는 작업자 (요청 처리와 별개로 속도 제한을 두고 실행)
+    if prewarm.PREWARM_ENABLED:
+        prewarm.prewarm_worker.start()
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """공유 HTTP 커넥션 풀과 HTML 추출 프로세스 풀을 정리합니다."""
+    http_client.close()
+    await http_client.aclose()
+    html_extract.shutdown()
+    prewarm.prewarm_worker.stop()
+
 @app.get("/", tags=["Root"])
 def read_root():
     """서버가 정상적으로 실행 중인지 확인하는 기본 경로입니다."""
     return {"message": "Cureat API 서버에 오신 것을 환영합니다!"}
 
+@app.get("/ready", tags=["Root"])
+def readiness():
+    """무거운 컴포넌트(모델, 형태소 분석기, 벡터 DB)의 로드 여부를 반환합니다. 모두 준비되기 전에는 503을 반환합니다."""
+    components = warmup.status()
+    ready = all(components.values())
+    return JSONResponse(status_code=200 if ready else 503, content={"ready": ready, "components": components})
+
 # --- User & Auth ---
 @app.post("/users/signup", response_model=schemas.User, tags=["User"])
 def signup_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
@@ -43,6 +76,81 @@ def create_date_course_api(request: schemas.CourseRequest, db: Session = Depends
     course_data = service.create_date_course(db, request, user)
     return course_data
 
+def _stream_frames(frames: Iterator[Dict[str, Any]], fmt: str) -> StreamingResponse:
+    """프레임(dict)들을 NDJSON(한 줄에 JSON 하나) 또는 SSE(event/data 형식)로 내보내는 응답"""
+    def encode():
+        for frame in frames:
+            data = json.dumps(frame, ensure_ascii=False, default=str)
+            yield f"event: {frame['type']}\ndata: {data}\n\n" if fmt == "sse" else data + "\n"
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(encode(), media_type=media_type, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/recommendations/stream", tags=["Recommendation"])
+def stream_recommendations(request: schemas.ChatRequest, format: str = Query("ndjson", regex="^(ndjson|sse)$"), db: Session = Depends(get_db)):
+    """/recommendations의 스트리밍 버전: 맛집 상세 정보가 준비되는 대로 restaurant 프레임을, 마지막에 summary 프레임을 보냅니다."""
+    user = crud.get_user_by_id(db, user_id=request.user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+
+    # 스트리밍 중에는 요청 세션을 쓰지 않으므로 검색 기록은 먼저 저장
+    crud.create_search_log(db, user_id=user.id, query=request.prompt)
+    return _stream_frames(service.iter_personalized_recommendation(request, user), format)
+
+@app.post("/date-course/stream", tags=["Date Course"])
+def stream_date_course(request: schemas.CourseRequest, format: str = Query("ndjson", regex="^(ndjson|sse)$"), db: Session = Depends(get_db)):
+    """/date-course의 스트리밍 버전: 코스의 모든 장소가 준비되는 대로 course 프레임을, 마지막에 summary 프레임을 보냅니다."""
+    user = crud.get_user_by_id(db, user_id=request.user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다.")
+
+    return _stream_frames(service.iter_date_course(request, user), format)
+
+# --- Metrics ---
+@app.get("/metrics/embeddings", tags=["Metrics"])
+def get_embedding_metrics():
+    """임베딩 마이크로 배칭의 큐 길이와 배치 크기 분포를 반환합니다."""
+    return nlpService.embedding_metrics()
+
+@app.get("/metrics/vector-store", tags=["Metrics"])
+def get_vector_store_metrics():
+    """벡터 저장소 백엔드의 항목 수, 메모리 사용량, 연산별 지연 시간을 반환합니다."""
+    return vectorDBService.vector_store_stats()
+
+@app.get("/metrics/detail-cache", tags=["Metrics"])
+def get_detail_cache_metrics():
+    """맛집 상세 정보 메모리 캐시의 적중/미스/축출 횟수를 반환합니다."""
+    return vectorDBService.detail_cache_stats()
+
+@app.get("/metrics/freshness", tags=["Metrics"])
+def get_freshness_metrics():
+    """맛집 상세 정보의 신선도별(fresh/stale/expired) 응답 수와 백그라운드 재수집 현황을 반환합니다."""
+    return freshness.refresh_scheduler.stats()
+
+@app.get("/metrics/detail-flight", tags=["Metrics"])
+def get_detail_flight_metrics():
+    """같은 맛집에 대한 동시 캐시 미스가 하나의 수집으로 합쳐진 횟수를 반환합니다."""
+    return service.detail_flight_stats()
+
+@app.get("/metrics/fetch", tags=["Metrics"])
+def get_fetch_metrics():
+    """크롤링 페이지 다운로드 횟수와 크기 제한으로 잘리거나 거부된 횟수를 반환합니다."""
+    return http_client.fetch_metrics()
+
+@app.get("/metrics/llm-cache", tags=["Metrics"])
+def get_llm_cache_metrics():
+    """LLM 응답 캐시의 항목 수, 디스크 사용량, 적중률을 반환합니다."""
+    return llm_cache.llm_cache.stats()
+
+@app.get("/metrics/llm-prompts", tags=["Metrics"])
+def get_llm_prompt_metrics():
+    """맛집당 프롬프트 토큰 수(정리 전/후)와 여러 맛집을 묶은 요약 요청 지표를 반환합니다."""
+    return service.llm_prompt_metrics()
+
+@app.get("/metrics/prewarm", tags=["Metrics"])
+def get_prewarm_metrics():
+    """사전 크롤링 작업자의 처리/실패 건수와 작업 큐 상태별 개수를 반환합니다."""
+    return prewarm.prewarm_worker.stats()
+
 # --- Reviews (in PostgreSQL) ---
 @app.post("/reviews", response_model=schemas.Review, tags=["Review"])
 def write_review(review: schemas.ReviewCreate, db: Session = Depends(get_db)):
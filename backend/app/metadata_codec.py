@@ -0,0 +1,105 @@
+import json
+from typing import Any, Dict, List, Sequence
+
+try:
+    import orjson  # 더 빠른 JSON 직렬화 (선택 의존성)
+except ImportError:
+    orjson = None
+
+# ------------------------------
+# 맛집 메타데이터 코덱
+# ------------------------------
+# 벡터 저장소에는 전체 메타데이터를 JSON 문자열 하나(DOC_FIELD)로 저장하고,
+# 필터링/조회에 쓰는 몇 개의 스칼라 값만 별도 필드로 복사해 둔다.
+# 디코딩은 JSON 한 번 파싱으로 끝나며, '|'가 들어간 값도 그대로 복원된다.
+CODEC_VERSION = 1
+DOC_FIELD = "_doc"
+VERSION_FIELD = "_codec"
+
+# 별도 스칼라 필드로 저장하는 값 (벡터 저장소의 where 필터/pgvector 컬럼에서 사용)
+DISPLAY_FIELDS = ("name", "address", "image_url", "mapx", "mapy")
+FILTER_FIELDS = ("region", "category", "price_range", "review_trust_score")
+INDEXED_FIELDS = DISPLAY_FIELDS + FILTER_FIELDS
+
+# 예전 '|' 결합 방식으로 저장된 데이터에서 리스트로 복원할 필드 (schemas.RestaurantDetail 기준)
+LEGACY_LIST_FIELDS = ("summary_pros", "summary_cons", "keywords", "nearby_attractions", "categories")
+
+
+def _dumps(value: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(value, default=str).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _loads(raw: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _first(value: Any) -> Any:
+    if isinstance(value, list):
+        return value[0] if value else None
+    if isinstance(value, str) and "|" in value:
+        return value.split("|", 1)[0]
+    return value
+
+
+def derive_filter_fields(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """원본 메타데이터에서 필터용 스칼라 값(지역/카테고리/가격대/신뢰도)을 계산"""
+    address = metadata.get("address") or ""
+    try:
+        trust = int(metadata.get("review_trust_score"))
+    except (TypeError, ValueError):
+        trust = None
+    return {
+        "region": " ".join(address.split()[:2]) or None,
+        "category": metadata.get("category") or _first(metadata.get("categories")) or None,
+        "price_range": metadata.get("price_range") or metadata.get("summary_price") or None,
+        "review_trust_score": trust,
+    }
+
+
+def filter_fields(stored: Dict[str, Any]) -> Dict[str, Any]:
+    """저장된 메타데이터에서 필터용 값을 꺼냄 (예전 형식이면 새로 계산)"""
+    if VERSION_FIELD in stored:
+        return {field: stored.get(field) for field in FILTER_FIELDS}
+    return derive_filter_fields(stored)
+
+
+def encode(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """메타데이터 1건을 저장 형식으로 변환: {_doc: 전체 JSON, _codec: 버전, 인덱스용 스칼라 필드...}
+
+    ChromaDB 메타데이터는 None 값을 허용하지 않으므로 값이 없는 스칼라 필드는 생략한다.
+    """
+    scalars = {**{field: metadata.get(field) for field in DISPLAY_FIELDS}, **derive_filter_fields(metadata)}
+    stored = {field: value for field, value in scalars.items() if isinstance(value, (str, int, float, bool))}
+    stored[DOC_FIELD] = _dumps(metadata)
+    stored[VERSION_FIELD] = CODEC_VERSION
+    return stored
+
+
+def encode_many(metadatas: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [encode(metadata) for metadata in metadatas]
+
+
+def _decode_legacy(stored: Dict[str, Any]) -> Dict[str, Any]:
+    # 예전 형식: 리스트 필드가 '|'로 결합된 문자열
+    metadata = dict(stored)
+    for field in LEGACY_LIST_FIELDS:
+        value = metadata.get(field)
+        if isinstance(value, str) and value:
+            metadata[field] = value.split("|")
+    return metadata
+
+
+def decode(stored: Dict[str, Any]) -> Dict[str, Any]:
+    """저장 형식을 원래 메타데이터 dict로 복원 (JSON 한 번 파싱, 예전 '|' 형식도 지원)"""
+    doc = stored.get(DOC_FIELD)
+    if doc is None:
+        return _decode_legacy(stored)
+    return _loads(doc)
+
+
+def decode_many(stored_rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [decode(stored) for stored in stored_rows]
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship # SQLAlchemy 관계
 from sqlalchemy.sql import func # SQLAlchemy 함수
 from .database import Base # SQLAlchemy3 Base 가져오기
+from sqlalchemy.dialects.postgresql import JSONB # 메타데이터 저장용 JSONB
 from pgvector.sqlalchemy import Vector # pgvector 임포트
 
+EMBEDDING_DIM = 768 # jhgan/ko-sroberta-multitask 임베딩 차원
+
 class User(Base): # User 모델 정의
     __tablename__ = "users" # 테이블 이름
     
@@ -42,6 +45,7 @@ class Restaurant(Base):
     image_url = Column(String, nullable=True) # 음식점 이미지 URL
         
     reviews = relationship("Review", back_populates="restaurant") # 리뷰
+    embedding = relationship("RestaurantEmbedding", back_populates="restaurant", uselist=False) # 임베딩 (pgvector)
     
     
 class Review(Base): # Review 모델 정의 (사용자 리뷰 저장용)
@@ -66,3 +70,35 @@ class SearchLog(Base): # SearchLog 모델 정의
     query = Column(String, nullable=False) # 검색어
     timestamp = Column(DateTime(timezone=True), server_default=func.now()) # 검색 시간
     user = relationship("User", back_populates="search_logs") # 사용자와의 관계
+
+# 맛집 임베딩 모델 (VECTOR_STORE_BACKEND=pgvector일 때 사용)
+class RestaurantEmbedding(Base):
+    """맛집 벡터와 요약 메타데이터 (벡터 저장소의 pgvector 백엔드)
+
+    k-NN 검색과 지역/가격/카테고리/신뢰도 필터를 SQL 한 문장으로 처리할 수 있도록
+    필터용 스칼라 컬럼을 메타데이터와 별도로 둔다.
+    """
+    __tablename__ = "restaurant_embeddings" # 테이블 이름
+
+    id = Column(String, primary_key=True) # 벡터 저장소 ID ("이름_주소")
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=True, index=True) # 음식점 ID
+    embedding = Column(Vector(EMBEDDING_DIM), nullable=False) # 임베딩 벡터
+    metadata_json = Column(JSONB, nullable=False, default=dict) # 요약 정보 등 메타데이터
+
+    # 필터용 컬럼
+    region = Column(String, nullable=True, index=True) # 지역 (주소 앞 두 단어, 예: "서울 강남구")
+    category = Column(String, nullable=True, index=True) # 음식 카테고리
+    price_range = Column(String, nullable=True) # 가격대
+    review_trust_score = Column(Integer, nullable=True, index=True) # 리뷰 교차검증 신뢰도 (0~100)
+
+    restaurant = relationship("Restaurant", back_populates="embedding") # 음식점과의 관계
+
+    __table_args__ = (
+        # 코사인 거리 기준 HNSW 근사 최근접 인덱스
+        Index(
+            "ix_restaurant_embeddings_embedding_hnsw", "embedding",
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"embedding": "vector_cosine_ops"},
+        ),
+    )
@@ -0,0 +1,112 @@
+import os
+import zlib
+import difflib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# ------------------------------
+# 리뷰 스니펫 유사 중복 탐지 설정 (환경 변수로 조정 가능)
+# ------------------------------
+SNIPPET_MATCH_THRESHOLD = float(os.getenv("SNIPPET_MATCH_THRESHOLD", "0.6"))  # difflib 유사도가 이 값을 넘으면 같은 리뷰로 봄
+# LSH 인덱스 사용 여부 (근사): 켜면 큰 입력에서 훨씬 빠르지만, MinHash가 놓친 쌍 때문에 difflib 전체 비교와
+# 병합 결과/신뢰도 점수가 드물게 달라질 수 있다 (bench_near_dup 기준 100x100에서 약 7%). 기본값은 정확한 전체 비교.
+SNIPPET_USE_LSH = os.getenv("SNIPPET_USE_LSH", "0") == "1"
+SHINGLE_SIZE = int(os.getenv("SNIPPET_SHINGLE_SIZE", "2"))  # 문자 n-gram 길이 (한글은 2음절이 difflib 유사도와 가장 잘 맞음)
+LSH_BANDS = int(os.getenv("SNIPPET_LSH_BANDS", "32"))
+LSH_ROWS = int(os.getenv("SNIPPET_LSH_ROWS", "2"))  # 밴드당 해시 수 (BANDS * ROWS = MinHash 길이)
+# 비교할 쌍이 이 값보다 적으면 인덱스를 만들지 않고 전부 직접 비교 (기존 상한 20x20 수준)
+LSH_MIN_PAIRS = int(os.getenv("SNIPPET_LSH_MIN_PAIRS", "400"))
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 31, size=LSH_BANDS * LSH_ROWS, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=LSH_BANDS * LSH_ROWS, dtype=np.uint64)
+
+
+def _shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """공백을 정리한 문자 n-gram의 32비트 해시 배열 (중복 제거)"""
+    text = " ".join(text.split())
+    if len(text) <= size:
+        grams = {text}
+    else:
+        grams = {text[i:i + size] for i in range(len(text) - size + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(text: str) -> np.ndarray:
+    """문자 n-gram 집합의 MinHash 시그니처 (길이 LSH_BANDS * LSH_ROWS)"""
+    hashes = _shingles(text)
+    if hashes.size == 0:
+        return np.full(_PERM_A.shape, _MAX_HASH, dtype=np.uint64)
+    # (a*x + b) mod p: a, x < 2^32 이므로 곱이 uint64 범위를 넘지 않음
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return (permuted & _MAX_HASH).min(axis=1)
+
+
+class SnippetIndex:
+    """MinHash 밴드를 키로 하는 LSH 인덱스: 비슷할 가능성이 있는 스니펫 번호만 빠르게 추림"""
+
+    def __init__(self, texts: List[str]):
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        for i, text in enumerate(texts):
+            for key in self._band_keys(minhash(text)):
+                self._buckets[key].append(i)
+
+    @staticmethod
+    def _band_keys(signature: np.ndarray):
+        for band in range(LSH_BANDS):
+            yield band, signature[band * LSH_ROWS:(band + 1) * LSH_ROWS].tobytes()
+
+    def candidates(self, text: str) -> List[int]:
+        found = set()
+        for key in self._band_keys(minhash(text)):
+            found.update(self._buckets.get(key, ()))
+        return sorted(found)
+
+
+def is_similar(a: str, b: str, threshold: float = SNIPPET_MATCH_THRESHOLD) -> bool:
+    """difflib 유사도가 threshold를 넘는지 확인 (상한값으로 먼저 걸러 비싼 ratio() 계산을 줄임)"""
+    total = len(a) + len(b)
+    if not total or 2 * min(len(a), len(b)) / total <= threshold:
+        return False
+    matcher = difflib.SequenceMatcher(None, a, b)
+    return matcher.quick_ratio() > threshold and matcher.ratio() > threshold
+
+
+def match_snippets(naver_snips: List[str], daum_snips: List[str], threshold: float = SNIPPET_MATCH_THRESHOLD,
+                   use_index: Optional[bool] = None) -> List[Optional[int]]:
+    """네이버 스니펫마다 처음으로 유사도 기준을 넘는(아직 짝지어지지 않은) 다음 스니펫 번호를 반환, 없으면 None
+
+    기본은 difflib 전체 비교와 같은 결과를 내는 정확한 경로다 (길이/quick_ratio 상한으로 ratio() 계산만 줄임).
+    use_index=True(또는 SNIPPET_USE_LSH=1이고 쌍이 많을 때)면 LSH 인덱스로 후보만 추려 거의 선형 시간에 끝나지만 근사 결과다.
+    """
+    if use_index is None:
+        use_index = SNIPPET_USE_LSH and len(naver_snips) * len(daum_snips) >= LSH_MIN_PAIRS
+    index = SnippetIndex(daum_snips) if use_index else None
+    all_indices = range(len(daum_snips))
+    used = set()
+    matches: List[Optional[int]] = []
+    for n_snip in naver_snips:
+        match = None
+        for i in (index.candidates(n_snip) if index else all_indices):
+            if i not in used and is_similar(n_snip, daum_snips[i], threshold):
+                match = i
+                used.add(i)
+                break
+        matches.append(match)
+    return matches
+
+
+def cross_validate_review_sets(naver_snips: List[str], daum_snips: List[str], threshold: float = SNIPPET_MATCH_THRESHOLD,
+                               use_index: Optional[bool] = None) -> Tuple[List[str], int]:
+    """두 출처의 스니펫을 합치고(겹치는 다음 스니펫은 제외) 교차 검증된 비율로 신뢰도 점수(0~100)를 계산"""
+    matches = match_snippets(naver_snips, daum_snips, threshold, use_index)
+    used = {i for i in matches if i is not None}
+    merged_texts = list(naver_snips) + [d_snip for i, d_snip in enumerate(daum_snips) if i not in used]
+    cross_count = len(used)
+    total_snips = len(merged_texts)
+    score = int((cross_count * 2 / max(total_snips, 1)) * 100) if total_snips else 0
+    return merged_texts, min(score, 100)
@@ -1,21 +1,59 @@
-import re
-from konlpy.tag import Okt
-from sentence_transformers import SentenceTransformer
-from typing import List
+import os
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
 
-# 모델 로딩
-# 한국어 처리에 특화된 사전 학습된 백터 변환 모델 로드
+import numpy as np
+
+from . import tokenizer
+from .embedding_batcher import MicroBatcher
+
+# 임베딩 설정 (환경 변수로 조정 가능)
+VECTOR_MODEL_NAME = 'jhgan/ko-sroberta-multitask'
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32")) # 모델 1회 forward에 넣을 문장 수
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "4096")) # 메모리 LRU 항목 수
+EMBED_CACHE_PATH = os.getenv("EMBED_CACHE_PATH", "") # 디스크 캐시 경로 (비워두면 사용 안 함)
+EMBED_MICROBATCH = os.getenv("EMBED_MICROBATCH", "1") == "1" # 동시 요청 마이크로 배칭 사용 여부
+EMBED_MICROBATCH_WAIT_MS = float(os.getenv("EMBED_MICROBATCH_WAIT_MS", "5")) # 배치를 모으는 최대 대기 시간
+
+# 모델 로딩 (지연 초기화)
+# 한국어 처리에 특화된 사전 학습된 백터 변환 모델은 import 시점이 아니라
+# 처음 사용할 때 한 번만 로드합니다. (API 서버 기동 시간 단축)
 # 이 코드가 처음 실행될 때 모델을 다운로드하며, 몇 분 정도 소요될 수 있음
+_vector_model = None
+_vector_model_failed = False
+_model_lock = threading.Lock()
+
+def get_vector_model():
+    """SentenceTransformer 모델을 반환 (최초 호출 시 로드, 로드 실패 시 None)"""
+    global _vector_model, _vector_model_failed
+    if _vector_model is None and not _vector_model_failed:
+        with _model_lock:
+            if _vector_model is None and not _vector_model_failed:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    _vector_model = SentenceTransformer(VECTOR_MODEL_NAME)
+                except Exception as e:
+                    print(f"모델 로딩 중 오류 발생: {e}")
+                    print("인터넷 연결을 확인하거나 'pip install sentence-transformers'를 실행해주세요.")
+                    _vector_model_failed = True
+    return _vector_model
 
-try:
-    vector_model = SentenceTransformer('jhgan/ko-sroberta-multitask')
-except Exception as e:
-    print(f"모델 로딩 중 오류 발생: {e}")
-    print("인터넷 연결을 확인하거나 'pip install sentence-transformers'를 실행해주세요.")
-    vector_model = None
-    
-# 형태소 분석을 위해 Okt 객체 생성
-okt = Okt()
+def get_okt():
+    """형태소 분석을 위한 Okt 객체를 반환 (최초 호출 시 JVM 기동)"""
+    return tokenizer.get_tokenizer("okt").load()
+
+def get_tokenizer():
+    """설정된 형태소 분석 백엔드(TOKENIZER_BACKEND)를 반환"""
+    return tokenizer.get_tokenizer()
+
+def is_vector_model_loaded() -> bool:
+    return _vector_model is not None
+
+def is_tokenizer_loaded() -> bool:
+    return tokenizer.get_tokenizer().loaded
 
 # 데이터 전처리 (텍스트 정제 및 토큰화) 모델
 def preprocess_text(text: str) -> str:
@@ -23,37 +61,131 @@ def preprocess_text(text: str) -> str:
     1. 한글, 공백을 제외한 모든 특수문자, 이모티콘 등 제거
     2. 형태소 분석을 통해 의미있는 품사(명사, 형용사, 동사)만 추출
     3. 불필요한 단어(불용어)와 한 글자 단어 제거
+    형태소 분석 백엔드는 TOKENIZER_BACKEND로 선택하며(tokenizer.py), 같은 텍스트는 캐시된 결과를 사용
     """
-    
-    # 1. 정규 표현식을 사용하여 한글, 공백, 외 문자 제거
-    text = re.sub(r"[^ㄱ-ㅎㅏ-ㅣ가-힣\s]", "", text)
-    
-    # 2. 형태소 분석 및 품사 태깅(단어의 원형 복원 포함)
-    tokens = okt.pos(text, stem=True)
-    
-    # 3. 불용어 리스트 정의 (필요에 따라 계속 추가 가능)
-    stopwords = ['하다', '있다', '되다', '그', '않다', '없다', '나', '말', '사람', '이', '보다', '등', '같다', '것']
-
-    # 4. 의미있는 품사이면서 불용어가 아니고, 두 글자 이상 단어만 필터링
-    meaningful_tokens = [
-        word for word, pos in tokens 
-        if pos in ['Noun', 'Adjective', 'Verb'] and word not in stopwords and len(word) > 1
-    ]
-    
-    # 정제된 토큰들을 공백으로 구분된 하나의 문자열로 합쳐서 반환
-    return " ".join(meaningful_tokens)
+    return tokenizer.preprocess(text)
+
+def preprocess_texts(texts: List[str]) -> List[str]:
+    """여러 텍스트를 한 번에 전처리 (중복 제거 + 백엔드 배치 분석)"""
+    return tokenizer.preprocess_batch(texts)
+
+# 임베딩 캐시
+class EmbeddingCache:
+    """전처리된 텍스트의 해시 → float32 벡터 캐시 (메모리 LRU + 선택적 SQLite 디스크 계층)"""
+
+    def __init__(self, maxsize: int = EMBED_CACHE_SIZE, path: str = EMBED_CACHE_PATH):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.path = path
+        self._conn = None
+        self._conn_pid = None
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        # SQLite 연결은 fork를 넘어 공유하면 안 되므로 프로세스마다 새로 연결
+        if not self.path:
+            return None
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            self._conn.commit()
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def make_key(preprocessed_text: str) -> str:
+        # 모델이 바뀌면 같은 텍스트라도 다른 벡터이므로 모델 이름을 키에 포함
+        return hashlib.sha1(f"{VECTOR_MODEL_NAME}\0{preprocessed_text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._data.get(key)
+            if vector is not None:
+                self._data.move_to_end(key)
+                return vector
+            conn = self._connection()
+            if conn is None:
+                return None
+            row = conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        vector = np.frombuffer(row[0], dtype=np.float32)
+        self._remember(key, vector)
+        return vector
+
+    def set_many(self, items: List[tuple]):
+        for key, vector in items:
+            self._remember(key, vector)
+        if self.path and items:
+            with self._lock:
+                conn = self._connection()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in items],
+                )
+                conn.commit()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._data[key] = vector
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+embedding_cache = EmbeddingCache()
+
+# 마이크로 배칭: 동시에 들어온 요청들의 캐시 미스를 모아 한 번의 forward로 처리
+def _encode_batch(texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+    return get_vector_model().encode(texts, batch_size=batch_size, convert_to_numpy=True).astype(np.float32, copy=False)
+
+embedding_batcher = MicroBatcher(_encode_batch, max_batch_size=EMBED_BATCH_SIZE, max_wait_ms=EMBED_MICROBATCH_WAIT_MS)
+
+def _encode(texts: List[str], batch_size: int) -> np.ndarray:
+    # 이미 배치 크기만큼 모인 대량 요청은 대기 없이 바로 인코딩
+    if not EMBED_MICROBATCH or len(texts) >= batch_size:
+        return _encode_batch(texts, batch_size)
+    return np.stack(embedding_batcher.encode(texts))
+
+def embedding_metrics() -> dict:
+    """마이크로 배칭 큐 길이/배치 크기 지표"""
+    return {"enabled": EMBED_MICROBATCH, **embedding_batcher.metrics()}
 
 # 백터 변환 모델
-def text_to_vector(text: str) -> List[float]:
-    """입력된 텍스트를 벡터로 변환"""
+def texts_to_vectors(texts: List[str], batch_size: int = EMBED_BATCH_SIZE) -> np.ndarray:
+    """여러 텍스트를 한 번에 벡터로 변환하여 (len(texts), dim) float32 행렬로 반환
+    1. 중복 텍스트는 한 번만 전처리
+    2. 캐시에 없는 텍스트만 모아 한 번의 encode 호출로 배치 처리
+    """
+    vector_model = get_vector_model()
     if not vector_model:
         raise ValueError("벡터 변환 모델이 로드되지 않았습니다.")
-    
-    # 1. 텍스트 전처리 (노이즈 제거)
-    preprocessed_text = preprocess_text(text)
-    
-    # 2. 전처리된 텍스트를 벡터로 변환
-    vector = vector_model.encode(preprocessed_text)
-    
-    # 3. DB에 저장하기 쉽도록 numpy 배열을 리스트로 변환하여 반환
-    return vector.tolist()
\ No newline at end of file
+    if not texts:
+        return np.empty((0, vector_model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    # 1. 고유 텍스트별로 한 번만 전처리
+    unique_texts = list(dict.fromkeys(texts))
+    preprocessed = dict(zip(unique_texts, preprocess_texts(unique_texts)))
+
+    # 2. 캐시 조회 후 없는 것만 배치 인코딩
+    vectors, missing = {}, []
+    for p_text in dict.fromkeys(preprocessed.values()):
+        cached = embedding_cache.get(EmbeddingCache.make_key(p_text))
+        if cached is None:
+            missing.append(p_text)
+        else:
+            vectors[p_text] = cached
+    if missing:
+        encoded = _encode(missing, batch_size)
+        new_items = []
+        for p_text, row in zip(missing, encoded):
+            vectors[p_text] = row
+            new_items.append((EmbeddingCache.make_key(p_text), row))
+        embedding_cache.set_many(new_items)
+
+    # 3. 입력 순서대로 행렬 구성
+    return np.stack([vectors[preprocessed[text]] for text in texts]).astype(np.float32, copy=False)
+
+def text_to_vector(text: str) -> List[float]:
+    """입력된 텍스트를 벡터로 변환"""
+    # DB에 저장하기 쉽도록 numpy 배열을 리스트로 변환하여 반환
+    return texts_to_vectors([text])[0].tolist()
@@ -0,0 +1,158 @@
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from typing import NamedTuple, Optional, Dict
+
+try:
+    import zstandard  # 압축률/속도가 좋은 zstd 사용 (선택 의존성, 없으면 zlib)
+except ImportError:
+    zstandard = None
+
+# ------------------------------
+# 페이지 캐시 설정 (환경 변수로 조정 가능)
+# ------------------------------
+PAGE_CACHE_PATH = os.getenv("PAGE_CACHE_PATH", "./page_cache.db")
+PAGE_CACHE_TTL = int(os.getenv("PAGE_CACHE_TTL", str(24 * 3600)))  # 이 시간 동안은 재검증 없이 사용(초)
+PAGE_CACHE_MAX_AGE = int(os.getenv("PAGE_CACHE_MAX_AGE", str(30 * 24 * 3600)))  # 이후엔 purge 대상(초)
+PAGE_CACHE_PURGE_INTERVAL = int(os.getenv("PAGE_CACHE_PURGE_INTERVAL", "3600"))  # 저장 시 이 간격마다 오래된 항목 정리(초)
+
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+
+
+class CachedPage(NamedTuple):
+    url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl: int = PAGE_CACHE_TTL) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """조건부 요청(ETag/Last-Modified 재검증)에 사용할 헤더"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _compress(text: str):
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=6).compress(raw)
+    return CODEC_ZLIB, zlib.compress(raw, 6)
+
+
+def _decompress(codec: str, data: bytes) -> str:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 캐시를 읽으려면 'pip install zstandard'를 실행해주세요.")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+class PageCache:
+    """URL → 추출된 본문 텍스트 캐시 (원본 HTML이 아닌 readability 추출 결과를 저장)
+
+    본문은 내용 해시로 한 번만 저장되므로, 같은 글이 여러 URL로 노출돼도 디스크에는 한 벌만 남는다.
+    """
+
+    def __init__(self, path: str = PAGE_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._last_purge = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite 연결은 fork를 넘어 공유하면 안 되므로 프로세스마다 처음 사용할 때 연결
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS page_texts (
+                    content_hash TEXT PRIMARY KEY,
+                    codec TEXT NOT NULL,
+                    data BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS pages (
+                    url_hash TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL
+                );
+            """)
+            self._conn.commit()
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    @staticmethod
+    def _url_hash(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT p.etag, p.last_modified, p.fetched_at, t.codec, t.data "
+                "FROM pages p JOIN page_texts t ON p.content_hash = t.content_hash WHERE p.url_hash = ?",
+                (self._url_hash(url),),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, fetched_at, codec, data = row
+        try:
+            text = _decompress(codec, data)
+        except Exception:
+            return None
+        return CachedPage(url, text, etag, last_modified, fetched_at)
+
+    def put(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        content_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        codec, data = _compress(text)
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR IGNORE INTO page_texts (content_hash, codec, data) VALUES (?, ?, ?)",
+                (content_hash, codec, data),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url_hash, url, content_hash, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self._url_hash(url), url, content_hash, etag, last_modified, time.time()),
+            )
+            conn.commit()
+            # 별도 정리 작업 없이도 파일이 무한히 커지지 않도록 쓰기 경로에서 주기적으로 purge
+            if time.time() - self._last_purge >= PAGE_CACHE_PURGE_INTERVAL:
+                self._purge_locked(conn, PAGE_CACHE_MAX_AGE)
+
+    def touch(self, url: str):
+        """304 Not Modified 응답을 받았을 때 신선도만 갱신"""
+        with self._lock:
+            conn = self._connection()
+            conn.execute("UPDATE pages SET fetched_at = ? WHERE url_hash = ?", (time.time(), self._url_hash(url)))
+            conn.commit()
+
+    def purge(self, max_age: int = PAGE_CACHE_MAX_AGE) -> int:
+        """오래된 항목과 더 이상 참조되지 않는 본문을 삭제하고 삭제된 페이지 수를 반환"""
+        with self._lock:
+            return self._purge_locked(self._connection(), max_age)
+
+    def _purge_locked(self, conn: sqlite3.Connection, max_age: int) -> int:
+        self._last_purge = time.time()
+        cur = conn.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - max_age,))
+        conn.execute("DELETE FROM page_texts WHERE content_hash NOT IN (SELECT content_hash FROM pages)")
+        conn.commit()
+        return cur.rowcount
+
+
+page_cache = PageCache()
@@ -0,0 +1,266 @@
+"""인기 지역/검색어의 맛집을 요청 경로 밖에서 미리 크롤링·요약·임베딩해 두는 백그라운드 작업자
+
+단독 실행: python -m backend.app.prewarm [--once]
+서버 안에서 실행: PREWARM_ENABLED=1 (워커 프로세스마다 스레드 하나, 작업 큐는 SQLite 파일로 공유)
+속도 제한은 작업자마다 따로 적용되므로, 서버 워커가 여럿이면 단독 실행 하나만 두는 것을 권장한다.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import argparse
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from . import crud, service, freshness, vectorDBService as vector_db_service
+from .database import SessionLocal
+
+# ------------------------------
+# 사전 크롤링 설정 (환경 변수로 조정 가능)
+# ------------------------------
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "0") == "1"
+PREWARM_QUEUE_PATH = os.getenv("PREWARM_QUEUE_PATH", "./prewarm_queue.db")
+PREWARM_SEED_REGIONS = [r.strip() for r in os.getenv("PREWARM_SEED_REGIONS", "강남역,홍대,성수동,이태원,잠실").split(",") if r.strip()]
+PREWARM_SEED_THEMES = [t.strip() for t in os.getenv("PREWARM_SEED_THEMES", "데이트,가족,회식").split(",") if t.strip()]
+PREWARM_TOP_QUERIES = int(os.getenv("PREWARM_TOP_QUERIES", "20"))  # search_logs에서 가져올 인기 검색어 수
+PREWARM_PLACES_PER_QUERY = int(os.getenv("PREWARM_PLACES_PER_QUERY", "5"))
+PREWARM_RATE_PER_MIN = float(os.getenv("PREWARM_RATE_PER_MIN", "6"))  # 분당 처리할 작업 수 (외부 API 부하 제한)
+PREWARM_SEED_INTERVAL = int(os.getenv("PREWARM_SEED_INTERVAL", "3600"))  # 시드 작업을 다시 넣는 주기(초)
+PREWARM_MAX_ATTEMPTS = int(os.getenv("PREWARM_MAX_ATTEMPTS", "3"))
+PREWARM_STALE_RUNNING = int(os.getenv("PREWARM_STALE_RUNNING", "600"))  # 이 시간 넘게 running인 작업은 작업자가 죽은 것으로 보고 다시 실행(초)
+
+KIND_QUERY = "query"  # 검색어 → 맛집 목록 검색 후 place 작업 추가
+KIND_PLACE = "place"  # 맛집 1곳 크롤링 → 요약 → 임베딩 → 저장
+
+
+class JobQueue:
+    """SQLite 기반 작업 큐 (여러 프로세스가 같은 파일을 공유해도 작업을 한 번씩만 가져감)"""
+
+    def __init__(self, path: str = PREWARM_QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite 연결은 fork를 넘어 공유하면 안 되므로 프로세스마다 처음 사용할 때 연결
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS prewarm_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    dedupe_key TEXT NOT NULL UNIQUE,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS ix_prewarm_jobs_status ON prewarm_jobs (status, available_at);
+            """)
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], dedupe_key: str, refresh_after: Optional[float] = None) -> bool:
+        """작업을 추가 (같은 키가 이미 있으면 무시, 끝난 작업이 refresh_after초보다 오래됐으면 다시 대기열로)"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO prewarm_jobs (kind, dedupe_key, payload, available_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, dedupe_key, json.dumps(payload, ensure_ascii=False), now, now),
+            )
+            if cur.rowcount or refresh_after is None:
+                return bool(cur.rowcount)
+            cur = conn.execute(
+                "UPDATE prewarm_jobs SET status = 'pending', attempts = 0, available_at = ?, updated_at = ?, error = NULL "
+                "WHERE dedupe_key = ? AND status IN ('done', 'failed') AND updated_at < ?",
+                (now, now, dedupe_key, now - refresh_after),
+            )
+            return bool(cur.rowcount)
+
+    def claim(self) -> Optional[Tuple[int, str, Dict[str, Any], int]]:
+        """실행할 작업 하나를 가져와 running으로 표시 (없으면 None)"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            # BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡아 다른 프로세스와 같은 작업을 가져가지 않도록 함
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE prewarm_jobs SET status = 'pending' WHERE status = 'running' AND updated_at < ?",
+                    (now - PREWARM_STALE_RUNNING,),
+                )
+                row = conn.execute(
+                    "SELECT id, kind, payload, attempts FROM prewarm_jobs WHERE status = 'pending' AND available_at <= ? "
+                    "ORDER BY kind = 'place' DESC, available_at LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE prewarm_jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE id = ?", (now, row[0]))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job_id, kind, payload, attempts = row
+        return job_id, kind, json.loads(payload), attempts + 1
+
+    def complete(self, job_id: int):
+        with self._lock:
+            self._connection().execute("UPDATE prewarm_jobs SET status = 'done', updated_at = ?, error = NULL WHERE id = ?", (time.time(), job_id))
+
+    def fail(self, job_id: int, attempts: int, error: str):
+        """실패한 작업은 지수 백오프 후 재시도하고, 최대 횟수를 넘기면 failed로 둠"""
+        now = time.time()
+        status = "failed" if attempts >= PREWARM_MAX_ATTEMPTS else "pending"
+        with self._lock:
+            self._connection().execute(
+                "UPDATE prewarm_jobs SET status = ?, available_at = ?, updated_at = ?, error = ? WHERE id = ?",
+                (status, now + 60 * 2 ** attempts, now, error[:500], job_id),
+            )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection().execute("SELECT status, COUNT(*) FROM prewarm_jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+
+class RateLimiter:
+    """분당 처리량을 제한하는 토큰 버킷 (버스트는 1건)"""
+
+    def __init__(self, per_minute: float = PREWARM_RATE_PER_MIN):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self, stop: Optional[threading.Event] = None):
+        with self._lock:
+            now = time.monotonic()
+            delay = max(self._next_at - now, 0.0)
+            self._next_at = max(self._next_at, now) + self.interval
+        if delay:
+            if stop is not None:
+                stop.wait(delay)
+            else:
+                time.sleep(delay)
+
+
+job_queue = JobQueue()
+
+
+def seed_jobs(queue: JobQueue = job_queue) -> int:
+    """지역×테마 시드와 search_logs의 인기 검색어로 검색어 작업을 추가하고 추가된 수를 반환"""
+    queries = [f"{region} {theme} 맛집" for region in PREWARM_SEED_REGIONS for theme in PREWARM_SEED_THEMES]
+    if PREWARM_TOP_QUERIES > 0:
+        db = SessionLocal()
+        try:
+            queries += [f"{query} 맛집" for query in crud.get_top_search_queries(db, limit=PREWARM_TOP_QUERIES)]
+        except Exception as e:
+            logging.warning(f"[PREWARM] 인기 검색어 조회 실패: {e}")
+        finally:
+            db.close()
+    added = 0
+    for query in dict.fromkeys(" ".join(q.split()) for q in queries):
+        added += queue.enqueue(KIND_QUERY, {"query": query}, f"{KIND_QUERY}:{query}", refresh_after=PREWARM_SEED_INTERVAL)
+    logging.info(f"[PREWARM] 검색어 작업 {added}개 추가 (후보 {len(queries)}개)")
+    return added
+
+
+def run_job(kind: str, payload: Dict[str, Any], queue: JobQueue = job_queue):
+    if kind == KIND_QUERY:
+        for item in service.search_naver_local(payload["query"], display=PREWARM_PLACES_PER_QUERY):
+            name = service._clean_html(item.get("title", ""))
+            address = item.get("roadAddress") or item.get("address", "")
+            if name and address:
+                restaurant_id = vector_db_service.make_restaurant_id(name, address)
+                # 끝난 맛집 작업은 저장된 정보가 stale이 될 즈음 다시 대기열에 넣음
+                queue.enqueue(KIND_PLACE, {"name": name, "address": address}, f"{KIND_PLACE}:{restaurant_id}",
+                              refresh_after=freshness.DETAIL_FRESH_TTL)
+    elif kind == KIND_PLACE:
+        # 저장된 정보가 fresh면 바로 끝나고, 아니면 이 작업 안에서 다시 수집 (중복 크롤링은 일어나지 않음)
+        if service.warm_restaurant_details(payload["name"], payload["address"]) is None:
+            raise RuntimeError("맛집 정보를 만들지 못했습니다.")
+    else:
+        raise ValueError(f"알 수 없는 작업 종류입니다: {kind}")
+
+
+class PrewarmWorker:
+    """작업 큐에서 작업을 하나씩 꺼내 속도 제한을 지키며 실행하는 스레드"""
+
+    def __init__(self, queue: JobQueue = job_queue, limiter: Optional[RateLimiter] = None):
+        self.queue = queue
+        self.limiter = limiter or RateLimiter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_seeded = 0.0
+        self.processed = 0
+        self.failed = 0
+
+    def run_once(self) -> bool:
+        """작업 하나를 실행하고, 실행할 작업이 없었으면 False를 반환"""
+        if time.monotonic() - self._last_seeded >= PREWARM_SEED_INTERVAL or not self._last_seeded:
+            self._last_seeded = time.monotonic()
+            seed_jobs(self.queue)
+        # 속도 제한은 작업을 running으로 표시하기 전에 기다림 (기다리는 동안 다른 작업자가 가져갈 수 있도록)
+        self.limiter.wait(self._stop)
+        if self._stop.is_set():
+            return False
+        claimed = self.queue.claim()
+        if claimed is None:
+            return False
+        job_id, kind, payload, attempts = claimed
+        try:
+            run_job(kind, payload, self.queue)
+        except Exception as e:
+            self.failed += 1
+            logging.warning(f"[PREWARM] {kind} 작업 실패 ({attempts}회째): {payload} - {e}")
+            self.queue.fail(job_id, attempts, str(e))
+        else:
+            self.processed += 1
+            self.queue.complete(job_id)
+        return True
+
+    def run_forever(self, idle_sleep: float = 30.0):
+        while not self._stop.is_set():
+            try:
+                if not self.run_once():
+                    self._stop.wait(idle_sleep)
+            except Exception as e:
+                logging.warning(f"[PREWARM] 작업자 오류: {e}")
+                self._stop.wait(idle_sleep)
+
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self.run_forever, name="prewarm", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": PREWARM_ENABLED, "processed": self.processed, "failed": self.failed, "queue": self.queue.stats()}
+
+
+prewarm_worker = PrewarmWorker()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--once", action="store_true", help="시드를 넣고 대기 중인 작업을 모두 처리한 뒤 종료")
+    args = parser.parse_args()
+    if not args.once:
+        prewarm_worker.run_forever()
+        return
+    while prewarm_worker.run_once():
+        pass
+    logging.info(f"[PREWARM] 완료: {prewarm_worker.stats()}")
+
+
+if __name__ == "__main__":
+    main()
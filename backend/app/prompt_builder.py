@@ -0,0 +1,100 @@
+import os
+import re
+import json
+import threading
+from typing import Any, Dict, List, Tuple
+
+from . import near_dup, snippet_classifier
+
+# ------------------------------
+# LLM 프롬프트 크기 설정 (환경 변수로 조정 가능)
+# ------------------------------
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "600"))  # 맛집 1곳의 리뷰 스니펫에 쓸 최대 토큰 수(추정치)
+PROMPT_DEDUP_THRESHOLD = float(os.getenv("PROMPT_DEDUP_THRESHOLD", "0.8"))  # 이보다 비슷한 스니펫은 하나만 남김
+
+_HANGUL = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣ]")
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 호출 없이 토큰 수를 어림 (한글은 약 1.5자, 그 외 문자는 약 4자당 1토큰)"""
+    hangul = len(_HANGUL.findall(text))
+    return int(hangul / 1.5 + (len(text) - hangul) / 4) + 1
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _informativeness(snippet: str) -> Tuple[int, int]:
+    # 리뷰 키워드가 많이 들어있고 서로 다른 단어가 많은 문장을 우선
+    return snippet_classifier.classify(snippet).score, len(set(snippet.split()))
+
+
+def select_snippets(snippets: List[str], budget: int = PROMPT_TOKEN_BUDGET) -> List[str]:
+    """스니펫을 중복 제거하고 정보량 순으로 정렬한 뒤 토큰 예산 안에 들어가는 만큼만 고름"""
+    unique = list(dict.fromkeys(" ".join(s.split()) for s in snippets if s and s.strip()))
+    selected: List[str] = []
+    used = 0
+    for snippet in sorted(unique, key=_informativeness, reverse=True):
+        cost = estimate_tokens(snippet)
+        if used + cost > budget:
+            continue
+        if any(snippet in kept or kept in snippet or near_dup.is_similar(snippet, kept, PROMPT_DEDUP_THRESHOLD) for kept in selected):
+            continue
+        selected.append(snippet)
+        used += cost
+    return selected
+
+
+class PromptMetrics:
+    """맛집 1곳당 프롬프트 토큰 수(정리 전/후) 누적 지표"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.restaurants = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.requests = 0
+        self.batched_restaurants = 0
+        self.fallbacks = 0
+
+    def record(self, before: int, after: int):
+        with self._lock:
+            self.restaurants += 1
+            self.tokens_before += before
+            self.tokens_after += after
+
+    def record_request(self, size: int, fallbacks: int = 0):
+        with self._lock:
+            self.requests += 1
+            self.batched_restaurants += size
+            self.fallbacks += fallbacks
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            n = self.restaurants
+            return {
+                "restaurants": n,
+                "avg_tokens_before": round(self.tokens_before / n, 1) if n else 0.0,
+                "avg_tokens_after": round(self.tokens_after / n, 1) if n else 0.0,
+                "reduction": round(1 - self.tokens_after / self.tokens_before, 4) if self.tokens_before else 0.0,
+                "llm_requests": self.requests,
+                "avg_restaurants_per_request": round(self.batched_restaurants / self.requests, 2) if self.requests else 0.0,
+                "per_item_fallbacks": self.fallbacks,
+            }
+
+
+prompt_metrics = PromptMetrics()
+
+
+def build_context(crawled_info: Dict[str, Any], budget: int = PROMPT_TOKEN_BUDGET) -> Dict[str, Any]:
+    """LLM에 넘길 크롤링 정보를 토큰 예산에 맞게 정리 (스니펫 중복 제거 + 정보량 순 선별)"""
+    context = {key: value for key, value in crawled_info.items() if key != "crawled_reviews"}
+    context["crawled_reviews"] = select_snippets(crawled_info.get("crawled_reviews", []), budget)
+    # 정리 전 크기는 기존 방식(들여쓰기 JSON 전체)을 기준으로 계산
+    prompt_metrics.record(estimate_tokens(json.dumps(crawled_info, ensure_ascii=False, indent=2)), estimate_tokens(_compact(context)))
+    return context
+
+
+def render_context(context: Dict[str, Any]) -> str:
+    return _compact(context)
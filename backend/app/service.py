@@ -4,19 +4,22 @@ import json
 import math
 import time
 import logging
-import difflib
-from typing import List, Dict, Any, Optional, Tuple
+import itertools
+import threading
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional, Tuple
 from datetime import datetime, timedelta
 
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 import google.generativeai as genai
-from bs4 import BeautifulSoup
-from readability import Document
 
 # --- 프로젝트 내부 모듈 Import ---
-from . import models, schemas, crud, nlpService, vector_db_service
+from . import models, schemas, crud, nlpService, vectorDBService as vector_db_service, concurrency, http_client, api_cache, page_cache, near_dup, snippet_classifier, html_extract, llm_cache, prompt_builder, freshness
+from .embedding_batcher import MicroBatcher
+from .singleflight import SingleFlight, KeyedFileLock, PgAdvisoryLock
+from .database import SessionLocal, SQLALCHEMY_DATABASE_URL
 
 # ------------------------------
 # 초기 설정
@@ -45,19 +48,24 @@ NAVER_BLOG_SEARCH_URL = "https://openapi.naver.com/v1/search/blog.json"
 KAKAO_WEB_SEARCH_URL = "https://dapi.kakao.com/v2/search/web"
 KAKAO_LOCAL_KEYWORD_URL = "https://dapi.kakao.com/v2/local/search/keyword.json"
 KAKAO_MOBILITY_DIRECTIONS_URL = "https://apis-navi.kakaomobility.com/v1/directions"
+SCRAPINGBEE_URL = "https://app.scrapingbee.com/api/v1/"
 REQUEST_TIMEOUT = 5.0
 MAX_RETRY = 2
-AD_REVIEW_PATTERNS = [r"소정의\s*원고료", r"체험단", r"업체로부터\s*제공", r"광고\s*참고", r"협찬"]
-
+RESOLVE_MAX_WORKERS = int(os.getenv("RESOLVE_MAX_WORKERS", "6"))  # 여러 맛집을 동시에 처리할 워커 수
+CRAWL_SNIPPET_BUDGET = int(os.getenv("CRAWL_SNIPPET_BUDGET", "40"))  # 이만큼 스니펫을 모으면 남은 페이지는 받지 않음
+CRAWL_MIN_PER_SOURCE = int(os.getenv("CRAWL_MIN_PER_SOURCE", "10"))  # 교차 검증을 위해 출처(네이버/다음)별로 최소한 모을 스니펫 수
+CRAWL_FETCH_WINDOW = int(os.getenv("CRAWL_FETCH_WINDOW", "4"))  # 맛집 1건에서 동시에 받는 페이지 수
 # ------------------------------
 # 외부 API 및 크롤링 헬퍼
 # ------------------------------
 def _naver_get(url: str, params: dict) -> Dict[str, Any]:
     headers = {"X-Naver-Client-Id": NAVER_CLIENT_ID or "", "X-Naver-Client-Secret": NAVER_CLIENT_SECRET or ""}
-    try:
-        resp = requests.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+    def fetch() -> Dict[str, Any]:
+        resp = http_client.get_session().get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
         resp.raise_for_status()
         return resp.json()
+    try:
+        return api_cache.response_cache.get_or_fetch(url, params, fetch)
     except requests.exceptions.RequestException as e:
         logging.warning(f"Naver API Error: {e}")
         return {}
@@ -65,14 +73,31 @@ def _naver_get(url: str, params: dict) -> Dict[str, Any]:
 def _kakao_get(url: str, params: dict) -> Dict[str, Any]:
     if not KAKAO_REST_KEY: return {}
     headers = {"Authorization": f"KakaoAK {KAKAO_REST_KEY}"}
-    try:
-        resp = requests.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+    def fetch() -> Dict[str, Any]:
+        resp = http_client.get_session().get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
         resp.raise_for_status()
         return resp.json()
+    try:
+        return api_cache.response_cache.get_or_fetch(url, params, fetch)
     except requests.exceptions.RequestException as e:
         logging.warning(f"Kakao API Error: {e}")
         return {}
 
+def search_naver_local(query: str, display: int = 5) -> List[Dict[str, Any]]:
+    return _naver_get(NAVER_LOCAL_URL, {"query": query, "display": display}).get("items", [])
+
+def kakao_search_web(query: str, size: int = 5) -> List[Dict[str, Any]]:
+    return _kakao_get(KAKAO_WEB_SEARCH_URL, {"query": query, "size": size}).get("documents", [])
+
+def fetch_image_url(name: str) -> Optional[str]:
+    items = _naver_get(NAVER_IMAGE_URL, {"query": name, "display": 1, "sort": "sim"}).get("items", [])
+    return items[0].get("link") if items else None
+
+def _search_place_with_image(name: str, address: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """네이버 Local 검색 결과와 대표 이미지 URL (이미지는 장소를 찾았을 때만 검색)"""
+    place = search_naver_local(f"{name} {address}", 1)
+    return place, fetch_image_url(name) if place else None
+
 def _clean_html(text: str) -> str:
     return re.sub(r"<\/?b>", "", text or "").strip()
 
@@ -85,117 +110,269 @@ def _safe_json_loads(raw: str, fallback: dict = None) -> dict:
     except json.JSONDecodeError:
         return fallback
 
-def fetch_html(url: str) -> str:
-    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
+FETCH_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
+
+def _fetch_via_scrapingbee(url: str) -> str:
+    if not SCRAPINGBEE_KEY: return ""
+    params = {"api_key": SCRAPINGBEE_KEY, "url": url, "render_js": "true"}
     try:
-        r = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-        r.raise_for_status()
-        return r.text
-    except Exception:
-        if SCRAPINGBEE_KEY:
-            params = {"api_key": SCRAPINGBEE_KEY, "url": url, "render_js": "true"}
-            try:
-                rr = requests.get("https://app.scrapingbee.com/api/v1/", params=params, timeout=20)
-                rr.raise_for_status()
-                return rr.text
-            except Exception as e2:
-                logging.warning(f"ScrapingBee fetch failed for {url}: {e2}")
+        with concurrency.host_limiter.limit(SCRAPINGBEE_URL):
+            return http_client.get_capped(SCRAPINGBEE_URL, params=params, timeout=20).text
+    except Exception as e2:
+        logging.warning(f"ScrapingBee fetch failed for {url}: {e2}")
     return ""
 
-def extract_main_text_from_html(html: str) -> str:
+def fetch_main_text(url: str) -> str:
+    """페이지 본문 텍스트를 반환 (페이지 캐시 우선, 만료 시 ETag/Last-Modified로 재검증)"""
+    cached = page_cache.page_cache.get(url)
+    if cached and cached.is_fresh():
+        return cached.text
+
+    validators = (None, None)
     try:
-        doc = Document(html)
-        return BeautifulSoup(doc.summary(), "html.parser").get_text(separator="\n").strip()
-    except Exception:
+        headers = {**FETCH_HEADERS, **(cached.validators() if cached else {})}
+        with concurrency.host_limiter.limit(url):
+            r = http_client.get_capped(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        if r.status_code == 304 and cached:
+            page_cache.page_cache.touch(url)
+            return cached.text
+        html, validators = r.text, (r.headers.get("ETag"), r.headers.get("Last-Modified"))
+    except http_client.FetchRejected as e:
+        # 이미지/PDF/초대형 페이지는 다른 경로로 다시 받아도 리뷰 본문이 아니므로 건너뜀
+        logging.info(f"[FETCH] 본문 수집 생략: {e}")
         return ""
+    except Exception:
+        html = _fetch_via_scrapingbee(url)
+        if not html and cached:
+            return cached.text # 재수집 실패 시 기존 본문을 그대로 사용
+
+    text = extract_main_text_from_html(html) if html else ""
+    if text:
+        page_cache.page_cache.put(url, text, *validators)
+    return text
+
+def extract_main_text_from_html(html: str) -> str:
+    return html_extract.extract(html)
 
 def extract_review_snippets_from_text(text: str) -> List[str]:
-    keywords = ["맛있", "추천", "별로", "최고", "불친절", "친절", "가격", "가성비", "재방문", "웨이팅", "대박", "최악", "분위기", "데이트", "오빠", "언니", "여자친구", "남자친구", "남친"
-                "가족", "아이", "유아", "여친", "남친"]
-    sentences = re.split(r'[.。!?\n]', text or "")
-    snippets = {s.strip() for s in sentences if len(s.strip()) > 20 and any(k in s for k in keywords)}
-    return sorted(list(snippets), key=len, reverse=True)[:20]
-
-def cross_validate_review_sets(naver_snips: List[str], daum_snips: List[str]) -> Tuple[List[str], int]:
-    merged_texts, cross_count = [], 0
-    used_daum_indices = set()
-    for n_snip in naver_snips:
-        best_match = False
-        for i, d_snip in enumerate(daum_snips):
-            if i in used_daum_indices: continue
-            if difflib.SequenceMatcher(None, n_snip, d_snip).ratio() > 0.6:
-                used_daum_indices.add(i)
-                cross_count += 1
-                best_match = True
-                break
-        merged_texts.append(n_snip)
-    
-    for i, d_snip in enumerate(daum_snips):
-        if i not in used_daum_indices:
-            merged_texts.append(d_snip)
-            
-    total_snips = len(merged_texts)
-    score = int((cross_count * 2 / max(total_snips, 1)) * 100) if total_snips else 0
-    return merged_texts, min(score, 100)
-
-def advanced_crawl_restaurant_details(name: str) -> Dict[str, Any]:
-    logging.info(f"[CRAWL] '{name}' 리뷰 교차검증 수집 시작")
+    return [tag.text for tag in snippet_classifier.classify_text(text)]
+
+def cross_validate_review_sets(naver_snips: List[str], daum_snips: List[str], threshold: float = near_dup.SNIPPET_MATCH_THRESHOLD) -> Tuple[List[str], int]:
+    return near_dup.cross_validate_review_sets(naver_snips, daum_snips, threshold)
+
+def _crawl_page_snippets(url: str) -> List[snippet_classifier.SnippetTag]:
+    """페이지 1개를 내려받아 리뷰 스니펫을 태깅 (광고 문장은 is_ad로 표시)"""
+    if not url: return []
+    return snippet_classifier.classify_text(fetch_main_text(url))
+
+class CrawlProgress(NamedTuple):
+    """크롤링 파이프라인이 페이지 하나를 처리할 때마다 내보내는 중간 결과"""
+    naver_snips: List[str]
+    daum_snips: List[str]
+    ad_count: int
+    pages_done: int
+    pages_total: int
+
+    @property
+    def enough(self) -> bool:
+        """스니펫 예산과 출처별 최소 개수를 모두 채웠는지 여부"""
+        return (len(self.naver_snips) + len(self.daum_snips) >= CRAWL_SNIPPET_BUDGET
+                and min(len(self.naver_snips), len(self.daum_snips)) >= CRAWL_MIN_PER_SOURCE)
+
+def iter_crawl_snippets(name: str, deadline: Optional[concurrency.Deadline] = None) -> Iterator[CrawlProgress]:
+    """검색 → 페이지 수집 → 스니펫 추출/분류 → 중복 제거를 페이지 단위로 진행하며 중간 결과를 내보내는 제너레이터
+
+    스니펫 예산을 채우면 남은 페이지는 받지 않고 끝나며, 호출자가 더 일찍 멈추면 그 시점에 수집을 중단한다.
+    """
+    deadline = deadline or concurrency.Deadline()
     query = f"{name} 후기"
-    
-    naver_items = _naver_get(NAVER_BLOG_SEARCH_URL, {"query": query, "display": 5}).get("items", [])
-    naver_snips = [snip for item in naver_items for snip in extract_review_snippets_from_text(extract_main_text_from_html(fetch_html(item.get("link", "")))) if not any(re.search(p, snip) for p in AD_REVIEW_PATTERNS)]
-    
-    daum_items = kakao_search_web(query, size=5)
-    daum_snips = [snip for item in daum_items for snip in extract_review_snippets_from_text(extract_main_text_from_html(fetch_html(item.get("url", "")))) if not any(re.search(p, snip) for p in AD_REVIEW_PATTERNS)]
 
+    # 네이버 블로그 검색과 카카오 웹 검색을 동시에 실행
+    naver_search = concurrency.submit(_naver_get, NAVER_BLOG_SEARCH_URL, {"query": query, "display": 5})
+    daum_search = concurrency.submit(kakao_search_web, query, 5)
+    naver_urls = [item.get("link", "") for item in concurrency.result_or(naver_search, deadline, {}).get("items", [])]
+    daum_urls = [item.get("url", "") for item in concurrency.result_or(daum_search, deadline, [])]
+
+    # 두 출처를 번갈아 받아야 일찍 멈춰도 교차 검증할 스니펫이 양쪽에 남음
+    naver_pages = [(True, url) for url in naver_urls if url]
+    daum_pages = [(False, url) for url in daum_urls if url]
+    pages = [page for pair in itertools.zip_longest(naver_pages, daum_pages) for page in pair if page]
+    page_tags: Dict[int, List[snippet_classifier.SnippetTag]] = {}
+
+    def ordered_snips(is_naver: bool) -> List[str]:
+        # 끝난 순서가 아니라 검색 결과 순서대로 합쳐야 같은 맛집은 매번 같은 병합 결과/점수/프롬프트(캐시 키)가 나옴
+        texts = (tag.text for i in sorted(page_tags) if pages[i][0] == is_naver for tag in page_tags[i] if not tag.is_ad)
+        return list(dict.fromkeys(texts))
+
+    # 페이지는 CRAWL_FETCH_WINDOW개씩 병렬로 받음 (호스트별 동시 요청 수 제한 + 전체 제한 시간 적용)
+    for index, tags in concurrency.iter_completed(_crawl_page_snippets, [url for _, url in pages], deadline, window=CRAWL_FETCH_WINDOW):
+        page_tags[index] = tags
+        ad_count = sum(tag.is_ad for page in page_tags.values() for tag in page)
+        pages_done = len(page_tags)
+        progress = CrawlProgress(ordered_snips(True), ordered_snips(False), ad_count, pages_done, len(pages))
+        yield progress
+        if progress.enough:
+            logging.info(f"[CRAWL] '{name}' 스니펫 예산 도달, 남은 페이지 {len(pages) - pages_done}개 생략")
+            return
+
+def advanced_crawl_restaurant_details(name: str, deadline: Optional[concurrency.Deadline] = None) -> Dict[str, Any]:
+    logging.info(f"[CRAWL] '{name}' 리뷰 교차검증 수집 시작")
+    progress = None
+    for progress in iter_crawl_snippets(name, deadline):
+        pass
+    if progress is None:
+        return {}
+
+    naver_snips, daum_snips = progress.naver_snips, progress.daum_snips
     merged, score = cross_validate_review_sets(naver_snips, daum_snips)
+    # 광고성 문장이 많이 섞인 검색 결과일수록 신뢰도를 낮춤
+    if progress.ad_count:
+        score = int(score * len(naver_snips + daum_snips) / (len(naver_snips + daum_snips) + progress.ad_count))
     return {"crawled_reviews": merged, "review_trust_score": score} if merged else {}
 
 # ------------------------------
 # LLM 요약 로직
 # ------------------------------
-def llm_summarize_details(name: str, crawled_info: Dict[str, Any]) -> Dict[str, Any]:
-    if not llm: return {}
-    prompt = f"""
-    너는 맛집 요약 전문가야. 아래 "크롤링 정보"를 읽고 반드시 아래 JSON 형식으로만 응답해줘.
-    [크롤링 정보]
-    {json.dumps(crawled_info, ensure_ascii=False, indent=2)}
-    [JSON 형식]
-    {{
+# 프롬프트 문구를 바꾸면 버전을 올려야 예전 응답이 LLM 캐시에서 재사용되지 않음
+SUMMARY_PROMPT_VERSION = "summary-v2"
+SUMMARY_BATCH_PROMPT_VERSION = "summary-batch-v1"
+COURSE_PROMPT_VERSION = "course-v1"
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "4"))  # 한 번의 요청에 묶어 요약할 맛집 수 (1이면 맛집마다 따로 요청)
+LLM_BATCH_WAIT_MS = float(os.getenv("LLM_BATCH_WAIT_MS", "200"))  # 같은 요청에 묶을 맛집을 기다리는 최대 시간
+LLM_BATCH_WORKERS = int(os.getenv("LLM_BATCH_WORKERS", "4"))  # 동시에 진행할 묶음 요청 수
+LLM_SUMMARY_TIMEOUT = float(os.getenv("LLM_SUMMARY_TIMEOUT", "20.0"))  # 맛집 1건 요약을 기다리는 최대 시간(초)
+
+SUMMARY_JSON_FORMAT = """{
       "summary_pros": ["장점1","장점2","장점3"],
       "summary_cons": ["단점1","단점2","단점3"],
       "keywords": ["키워드1","키워드2","키워드3","키워드4","키워드5"],
       "signature_menu": "대표 메뉴", "price_range": "가격대", "opening_hours": "영업시간",
       "parking": "주차 정보", "phone": "전화번호",
       "nearby_attractions": ["주변 놀거리1","주변 놀거리2","주변 놀거리3"]
-    }}"""
+    }"""
+
+def _summarize_one(name: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    prompt = f"""
+    너는 맛집 요약 전문가야. 아래 "크롤링 정보"를 읽고 반드시 아래 JSON 형식으로만 응답해줘.
+    [크롤링 정보]
+    {prompt_builder.render_context(context)}
+    [JSON 형식]
+    {SUMMARY_JSON_FORMAT}"""
     try:
-        resp = llm.generate_content(prompt)
-        return _safe_json_loads(getattr(resp, "text", "") or "{}")
+        inputs = {"name": name, "context": context}
+        completion = llm_cache.llm_cache.generate(llm, SUMMARY_PROMPT_VERSION, inputs, prompt, parse=_safe_json_loads)
+        return completion.parsed or {}
     except Exception as e:
         logging.warning(f"LLM summarize error: {e}")
         return {}
 
+def _is_summary(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value.get("summary_pros") or value.get("keywords"))
+
+def _summarize_many(items: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """여러 맛집을 한 번의 요청으로 요약하고, 응답에서 빠지거나 깨진 항목만 따로 다시 요청"""
+    if len(items) == 1:
+        prompt_builder.prompt_metrics.record_request(1)
+        return [_summarize_one(*items[0])]
+
+    keyed = {f"r{i}": {"name": name, **context} for i, (name, context) in enumerate(items)}
+    prompt = f"""
+    너는 맛집 요약 전문가야. 아래 여러 맛집의 "크롤링 정보"를 각각 읽고, 맛집 번호(r0, r1, ...)를 키로 하는
+    JSON 객체 하나로만 응답해줘. 각 값은 아래 "맛집별 JSON 형식"을 따라야 해.
+    [크롤링 정보]
+    {prompt_builder.render_context(keyed)}
+    [맛집별 JSON 형식]
+    {SUMMARY_JSON_FORMAT}"""
+    try:
+        completion = llm_cache.llm_cache.generate(llm, SUMMARY_BATCH_PROMPT_VERSION, keyed, prompt, parse=_safe_json_loads)
+        parsed = completion.parsed or {}
+    except Exception as e:
+        logging.warning(f"LLM batch summarize error ({len(items)}건): {e}")
+        parsed = {}
+
+    # 응답에서 빠진 항목은 배처의 작업자 스레드에서 따로 요청하고(Future), 묶음 응답에 있던 항목은 바로 호출자에게 돌려준다
+    results, fallbacks = [], 0
+    for key, (name, context) in zip(keyed, items):
+        summary = parsed.get(key)
+        if _is_summary(summary):
+            results.append(summary)
+        else:
+            fallbacks += 1
+            results.append(summary_batcher.call(_summarize_one, name, context))
+    prompt_builder.prompt_metrics.record_request(len(items), fallbacks)
+    return results
+
+summary_batcher = MicroBatcher(_summarize_many, max_batch_size=LLM_BATCH_SIZE, max_wait_ms=LLM_BATCH_WAIT_MS,
+                               name="summary-batcher", workers=LLM_BATCH_WORKERS)
+
+_summaries_in_flight = 0
+_summaries_lock = threading.Lock()
+
+def llm_summarize_details(name: str, crawled_info: Dict[str, Any], deadline: Optional[concurrency.Deadline] = None) -> Dict[str, Any]:
+    """크롤링 정보를 토큰 예산에 맞게 정리한 뒤 LLM으로 요약 (동시에 들어온 요청은 묶어서 한 번에 요청)
+
+    다른 요약 요청이 진행 중이지 않으면 묶을 상대를 기다리지 않고 바로 요청한다.
+    어느 경우든 결과는 deadline까지만 기다리며, 시간을 넘기면 빈 요약을 반환한다.
+    """
+    global _summaries_in_flight
+    if not llm: return {}
+    context = prompt_builder.build_context(crawled_info)
+    with _summaries_lock:
+        alone = _summaries_in_flight == 0
+        _summaries_in_flight += 1
+    try:
+        if LLM_BATCH_SIZE <= 1 or alone:
+            prompt_builder.prompt_metrics.record_request(1)
+            future = summary_batcher.call(_summarize_one, name, context)
+        else:
+            future = summary_batcher.submit((name, context))
+        deadline = deadline or concurrency.Deadline(LLM_SUMMARY_TIMEOUT)
+        try:
+            return future.result(timeout=deadline.remaining())
+        except FutureTimeoutError:
+            future.cancel()
+            logging.warning(f"LLM summarize timeout: '{name}'")
+            return {}
+    finally:
+        with _summaries_lock:
+            _summaries_in_flight -= 1
+
+def llm_prompt_metrics() -> Dict[str, Any]:
+    """맛집당 프롬프트 토큰 수(정리 전/후)와 묶음 요청 지표"""
+    return {**prompt_builder.prompt_metrics.snapshot(), "batcher": summary_batcher.metrics()}
+
 # ------------------------------
 # 핵심 비즈니스 로직 (맛집 추천)
 # ------------------------------
-def get_restaurant_details(db: Session, name: str, address: str) -> Optional[Dict[str, Any]]:
-    restaurant_id = f"{name}_{address}"
+# 요약(LLM) 결과가 아닌, 크롤링/검색으로 채우는 상세 정보 필드
+_NON_SUMMARY_FIELDS = frozenset({"name", "address", "image_url", "mapx", "mapy", "review_trust_score", "crawled_at", "source_hash", "schema_version"})
 
-    existing_data = vector_db_service.get_restaurant_by_id(restaurant_id)
-    if existing_data:
-        logging.info(f"[CACHE HIT] '{name}' 정보를 벡터 DB에서 바로 반환")
-        return existing_data
+def _build_restaurant_details(db: Session, name: str, address: str, previous: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """크롤링 → 요약 → 임베딩 → 저장을 실행하여 새 상세 정보를 반환 (리뷰를 하나도 못 모으면 None)
 
-    logging.info(f"[CACHE MISS] '{name}' 신규 처리 시작")
-    crawled_info = advanced_crawl_restaurant_details(name)
-    if not crawled_info.get("crawled_reviews"): return None
+    previous(기존 기록)와 크롤링한 리뷰가 같고 형식 버전도 같으면 LLM 요약을 다시 하지 않고 재사용한다.
+    요약을 얻지 못하면(시간 초과, LLM 오류 등) 저장하지 않고 반환만 하여 다음 접근 때 다시 수집되게 한다.
+    """
+    restaurant_id = vector_db_service.make_restaurant_id(name, address)
+    deadline = concurrency.Deadline()
+    # 네이버 Local 검색(+이미지 검색)은 크롤링 결과와 무관하므로 먼저 시작
+    place_future = concurrency.submit(_search_place_with_image, name, address)
+
+    crawled_info = advanced_crawl_restaurant_details(name, deadline)
+    if not crawled_info.get("crawled_reviews"):
+        place_future.cancel()
+        return None
 
-    summary_data = llm_summarize_details(name, crawled_info)
+    if (_is_summary(previous) and previous.get("schema_version") == freshness.DETAIL_SCHEMA_VERSION
+            and previous.get("source_hash") == freshness.source_hash(crawled_info["crawled_reviews"])):
+        freshness.refresh_scheduler.count("summary_reused")
+        summary_data = {k: v for k, v in previous.items() if k not in _NON_SUMMARY_FIELDS}
+    else:
+        # 크롤링 제한 시간은 이미 대부분 쓴 뒤이므로 요약 대기 시간은 따로 잡는다
+        summary_data = llm_summarize_details(name, crawled_info, concurrency.Deadline(LLM_SUMMARY_TIMEOUT))
     
     # 네이버 Local 검색으로 최종 정보 보정
-    naver_place = search_naver_local(f"{name} {address}", display=1)
-    image_url = fetch_image_url(name) if naver_place else None
+    naver_place, image_url = concurrency.result_or(place_future, deadline, ([], None))
     
     vector_text = " ".join(summary_data.get("keywords", [])) + " " + " ".join(summary_data.get("summary_pros", []))
     vector = nlpService.text_to_vector(vector_text)
@@ -207,13 +384,159 @@ def get_restaurant_details(db: Session, name: str, address: str) -> Optional[Dic
         "review_trust_score": crawled_info.get("review_trust_score", 0),
         **summary_data
     }
+    if not _is_summary(summary_data):
+        logging.warning(f"[SUMMARY] '{name}' 요약을 얻지 못해 저장하지 않음")
+        freshness.refresh_scheduler.count("summary_empty")
+        return metadata
+    freshness.stamp(metadata, crawled_info["crawled_reviews"])
     
     vector_db_service.upsert_restaurant(restaurant_id, vector, metadata)
-    crud.get_or_create_restaurant_in_postgres(db, name=name, address=address)
+    restaurant = crud.get_or_create_restaurant_in_postgres(db, name=name, address=address)
+    vector_db_service.link_restaurant(restaurant_id, restaurant.id)
     
     return metadata
 
-def get_personalized_recommendation(db: Session, request: schemas.ChatRequest, user: models.User) -> Dict[str, Any]:
+# 같은 맛집에 대한 동시 캐시 미스를 하나의 수집 파이프라인으로 합침
+# 프로세스 내: SingleFlight
+# 워커 간(선택): DETAIL_PG_LOCK=1이면 PostgreSQL advisory lock(여러 호스트 사이에서도 동작),
+# 아니면 DETAIL_LOCK_DIR의 잠금 파일(같은 호스트 안에서만 동작, 비워두면 프로세스 내에서만 합침)
+DETAIL_PG_LOCK = os.getenv("DETAIL_PG_LOCK", "0") == "1"
+DETAIL_PG_LOCK_POOL_SIZE = int(os.getenv("DETAIL_PG_LOCK_POOL_SIZE", "2"))  # 잠금 전용 커넥션 수 (= 동시에 잠금을 잡을 수 있는 맛집 수)
+DETAIL_PG_LOCK_TIMEOUT = float(os.getenv("DETAIL_PG_LOCK_TIMEOUT", "30.0"))  # 잠금을 기다리는 최대 시간(초), 넘기면 잠금 없이 수집
+DETAIL_LOCK_DIR = os.getenv("DETAIL_LOCK_DIR", "")
+detail_flight = SingleFlight()
+if DETAIL_PG_LOCK:
+    detail_worker_lock = PgAdvisoryLock(SQLALCHEMY_DATABASE_URL, pool_size=DETAIL_PG_LOCK_POOL_SIZE, timeout=DETAIL_PG_LOCK_TIMEOUT)
+else:
+    detail_worker_lock = KeyedFileLock(DETAIL_LOCK_DIR)
+_detail_flight_counts = {"built_by_other_worker": 0}
+_detail_flight_lock = threading.Lock()
+
+def _build_restaurant_details_once(db: Session, name: str, address: str, previous: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """_build_restaurant_details를 맛집마다 한 번만 실행하고, 동시에 요청한 호출자 모두에게 같은 결과를 반환"""
+    restaurant_id = vector_db_service.make_restaurant_id(name, address)
+
+    def build():
+        with detail_worker_lock.hold(restaurant_id):
+            # 잠금을 기다리는 동안 다른 워커가 이미 수집을 끝냈을 수 있으므로 저장소를 다시 확인
+            current = vector_db_service.get_restaurant_by_id(restaurant_id, use_cache=False)
+            if current and freshness.state(current) == freshness.FRESH:
+                with _detail_flight_lock:
+                    _detail_flight_counts["built_by_other_worker"] += 1
+                return current
+            return _build_restaurant_details(db, name, address, current or previous)
+
+    return detail_flight.do(restaurant_id, build)
+
+def detail_flight_stats() -> Dict[str, Any]:
+    """맛집 상세 정보 수집의 중복 제거 현황 (합쳐진 요청 수, 워커 간 잠금 대기 수 등)"""
+    with _detail_flight_lock:
+        counts = dict(_detail_flight_counts)
+    return {**detail_flight.stats(), **counts, "worker_lock": detail_worker_lock.stats()}
+
+def _refresh_with_own_session(name: str, address: str, previous: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        # 요약 없이 끝난 재수집은 저장되지 않았으므로 실패로 취급 (backoff 후 다시 시도)
+        rebuilt = _build_restaurant_details_once(db, name, address, previous)
+        return rebuilt if _is_summary(rebuilt) else None
+    finally:
+        db.close()
+
+def get_restaurant_details(db: Session, name: str, address: str) -> Optional[Dict[str, Any]]:
+    """맛집 상세 정보를 반환 (stale-while-revalidate)
+
+    fresh: 저장된 정보를 그대로 반환
+    stale: 저장된 정보를 바로 반환하고, 맛집마다 하나의 백그라운드 재수집을 예약
+    expired(최대 허용 기간 초과): 응답 전에 다시 수집 (실패하면 저장된 정보를 반환)
+    """
+    restaurant_id = vector_db_service.make_restaurant_id(name, address)
+
+    existing_data = vector_db_service.get_restaurant_by_id(restaurant_id)
+    if existing_data:
+        status = freshness.state(existing_data)
+        freshness.refresh_scheduler.count(status)
+        if status == freshness.FRESH:
+            logging.info(f"[CACHE HIT] '{name}' 정보를 벡터 DB에서 바로 반환")
+            return existing_data
+        if status == freshness.STALE:
+            logging.info(f"[CACHE STALE] '{name}' 기존 정보를 반환하고 백그라운드 재수집 예약")
+            freshness.refresh_scheduler.schedule(restaurant_id, lambda: _refresh_with_own_session(name, address, existing_data))
+            return existing_data
+        if freshness.refresh_scheduler.backing_off(restaurant_id):
+            # 최근 재수집이 실패한 맛집은 backoff 동안 오래된 정보를 그대로 반환
+            freshness.refresh_scheduler.count("refresh_backoff")
+            return existing_data
+        logging.info(f"[CACHE EXPIRED] '{name}' 정보가 너무 오래되어 다시 수집")
+        rebuilt = None
+        try:
+            rebuilt = _build_restaurant_details_once(db, name, address, existing_data)
+        finally:
+            freshness.refresh_scheduler.record_result(restaurant_id, _is_summary(rebuilt))
+        return rebuilt if _is_summary(rebuilt) else existing_data
+
+    logging.info(f"[CACHE MISS] '{name}' 신규 처리 시작")
+    return _build_restaurant_details_once(db, name, address)
+
+def warm_restaurant_details(name: str, address: str) -> Optional[Dict[str, Any]]:
+    """사전 크롤링용: 저장된 정보가 fresh가 아니면 백그라운드 예약 대신 그 자리에서 다시 수집 (속도 제한 안에서 실행되도록)"""
+    restaurant_id = vector_db_service.make_restaurant_id(name, address)
+    existing_data = vector_db_service.get_restaurant_by_id(restaurant_id)
+    if existing_data and freshness.state(existing_data) == freshness.FRESH:
+        return existing_data
+    db = SessionLocal()
+    try:
+        # 요약 없이 끝나면 저장되지 않았으므로 실패로 돌려 작업 큐가 다시 시도하게 함
+        rebuilt = _build_restaurant_details_once(db, name, address, existing_data)
+        return rebuilt if _is_summary(rebuilt) else None
+    finally:
+        db.close()
+
+def _resolve_with_own_session(place: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    # SQLAlchemy 세션은 스레드 간에 공유할 수 없으므로 워커마다 새 세션을 사용
+    db = SessionLocal()
+    try:
+        return get_restaurant_details(db, *place)
+    except Exception as e:
+        logging.warning(f"[RESOLVE] '{place[0]}' 처리 실패: {e}")
+        return None
+    finally:
+        db.close()
+
+def _resolvable_places(places: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """이름과 주소가 모두 있는 장소만 중복 없이 남김 (iter_resolved_places가 실제로 처리하는 목록)"""
+    return list(dict.fromkeys(p for p in places if p[0] and p[1]))
+
+def iter_resolved_places(places: List[Tuple[str, str]], max_workers: Optional[int] = None) -> Iterator[Tuple[Tuple[str, str], Optional[Dict[str, Any]]]]:
+    """(이름, 주소) 목록을 중복 제거 후 병렬로 처리하여 끝나는 순서대로 ((이름, 주소), 상세 정보)를 내보냄 (실패 시 None)"""
+    unique_places = _resolvable_places(places)
+    if not unique_places: return
+    workers = min(max_workers or RESOLVE_MAX_WORKERS, len(unique_places))
+    # 크롤링용 공유 스레드 풀과 분리된 풀을 사용해야 중첩 제출 시 교착 상태가 생기지 않음
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="resolve")
+    try:
+        futures = {pool.submit(_resolve_with_own_session, place): place for place in unique_places}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # 호출자가 중간에 멈추면(스트리밍 연결 종료 등) 아직 시작하지 않은 맛집은 처리하지 않음
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _resolve_places(places: List[Tuple[str, str]], max_workers: Optional[int] = None) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+    """(이름, 주소) 목록을 중복 제거 후 병렬로 처리하여 {(이름, 주소): 상세 정보} 형태로 반환"""
+    return dict(iter_resolved_places(places, max_workers))
+
+def resolve_restaurants_batch(places: List[Tuple[str, str]], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """여러 맛집의 상세 정보를 동시에 가져와 입력 순서대로 반환 (중복 및 실패한 맛집은 제외)"""
+    resolved = _resolve_places(places, max_workers)
+    results, seen = [], set()
+    for place in places:
+        if place in seen or not resolved.get(place): continue
+        seen.add(place)
+        results.append(resolved[place])
+    return results
+
+def _recommendation_places(request: schemas.ChatRequest, user: models.User) -> List[Tuple[str, str]]:
     # 간단한 조건 파싱 (향후 NLP 기반으로 고도화)
     conditions = {"region": request.prompt, "theme": "", "mood": "", "purpose": ""}
     for interest in (user.interests or "").split(','):
@@ -228,27 +551,55 @@ def get_personalized_recommendation(db: Session, request: schemas.ChatRequest, u
     
     top_candidates = list({item['link']: item for item in candidates if item.get("link")}.values())[:3]
 
-    restaurants = []
-    for item in top_candidates:
-        name = _clean_html(item.get("title", ""))
-        address = item.get("roadAddress") or item.get("address", "")
-        if name and address:
-            details = get_restaurant_details(db, name, address)
-            if details:
-                restaurants.append(details)
+    return [(_clean_html(item.get("title", "")), item.get("roadAddress") or item.get("address", "")) for item in top_candidates]
 
-    if not restaurants:
-        return {"answer": "요청 조건에 맞는 맛집을 찾지 못했어요.", "restaurants": []}
-    return {"answer": "요청 조건에 맞는 맛집을 추천합니다!", "restaurants": restaurants}
+def _recommendation_answer(found: bool) -> str:
+    return "요청 조건에 맞는 맛집을 추천합니다!" if found else "요청 조건에 맞는 맛집을 찾지 못했어요."
+
+def get_personalized_recommendation(db: Session, request: schemas.ChatRequest, user: models.User) -> Dict[str, Any]:
+    restaurants = resolve_restaurants_batch(_recommendation_places(request, user))
+    return {"answer": _recommendation_answer(bool(restaurants)), "restaurants": restaurants}
+
+def iter_personalized_recommendation(request: schemas.ChatRequest, user: models.User) -> Iterator[Dict[str, Any]]:
+    """맛집 추천 스트리밍: 상세 정보가 준비되는 대로 restaurant 프레임을 내보내고 마지막에 summary 프레임을 내보냄"""
+    started = time.monotonic()
+    count = 0
+    try:
+        for _, details in iter_resolved_places(_recommendation_places(request, user)):
+            if not details: continue
+            try:
+                restaurant = schemas.RestaurantDetail(**details).dict()
+            except Exception as e:
+                logging.warning(f"[STREAM] 맛집 변환 실패: {e}")
+                continue
+            count += 1
+            yield {"type": "restaurant", "data": restaurant}
+    except Exception as e:
+        # 스트림이 중간에 끊기지 않도록 오류 프레임을 보낸 뒤 summary로 마무리
+        logging.warning(f"Recommendation stream error: {e}")
+        yield {"type": "error", "message": "맛집 추천 중 오류가 발생했습니다."}
+    yield {"type": "summary", "answer": _recommendation_answer(count > 0), "count": count,
+           "elapsed_ms": round((time.monotonic() - started) * 1000)}
 
 # ------------------------------
 # 핵심 비즈니스 로직 (코스 추천)
 # ------------------------------
-def create_date_course(db: Session, request: schemas.CourseRequest, user: models.User) -> Dict[str, Any]:
-    # (공유해주신 정교한 코스 생성 로직을 여기에 통합하고,
-    # 각 장소를 get_restaurant_details로 처리하여 상세 정보를 채워넣습니다.)
-    logging.info(f"'{request.theme}' 테마의 코스 생성 요청")
-    
+def _parse_course_lines(raw: str) -> List[Tuple[str, List[str]]]:
+    """"코스 N: [제목] | 장소1 -> 장소2 ..." 형식의 LLM 응답을 (코스 제목, 장소명 목록) 목록으로 변환"""
+    course_lines = [line.strip() for line in raw.split('\n') if line.strip().startswith("코스")]
+    parsed_courses = []
+    for line in course_lines:
+        try:
+            title_part, steps_part = line.split("|", 1)
+            course_title = title_part.split(":", 1)[1].strip().strip('[]')
+            place_names = [name.strip() for name in steps_part.split("->")]
+            parsed_courses.append((course_title, place_names))
+        except Exception:
+            continue # 파싱 실패 시 해당 코스는 건너뜀
+    return parsed_courses
+
+def _plan_courses(request: schemas.CourseRequest) -> Tuple[List[Tuple[str, List[str]]], Dict[str, Tuple[str, str]]]:
+    """LLM으로 코스를 만들고 각 장소명을 검색하여 (코스 목록, {장소명: (이름, 주소)})를 반환"""
     # 예시: LLM을 이용한 간단한 코스 생성
     prompt = f"""
     너는 최고의 데이트 코스 플래너야. 아래 제약 조건에 맞춰 최적의 데이트 코스 3가지를 제안해줘.
@@ -259,36 +610,81 @@ def create_date_course(db: Session, request: schemas.CourseRequest, user: models
     [답변 형식]
     각 코스를 "코스 1: [코스 제목] | [장소1] -> [장소2]..." 형식으로 추천해줘.
     """
+    inputs = {"location": request.location, "start_time": request.start_time, "end_time": request.end_time, "theme": request.theme}
+    parsed_courses = llm_cache.llm_cache.generate(llm, COURSE_PROMPT_VERSION, inputs, prompt, parse=_parse_course_lines).parsed
+
+    # 모든 코스의 장소명을 한 번에 검색 (중복 제거 후 병렬 실행)
+    all_names = list(dict.fromkeys(name for _, names in parsed_courses for name in names if name))
+    search_results = concurrency.map_with_deadline(lambda n: search_naver_local(n, 1), all_names, concurrency.Deadline(), default=[])
+    name_to_place = {}
+    for name, result in zip(all_names, search_results):
+        if result:
+            item = result[0]
+            name_to_place[name] = (_clean_html(item.get("title","")), item.get("roadAddress") or item.get("address", ""))
+    return parsed_courses, name_to_place
+
+def _assemble_course(course_title: str, place_names: List[str], name_to_place: Dict[str, Tuple[str, str]],
+                     resolved: Dict[Tuple[str, str], Optional[Dict[str, Any]]]) -> Optional[schemas.CourseDetail]:
+    """상세 정보를 가져온 장소들로 코스 하나를 구성 (변환 실패 또는 장소가 하나도 없으면 None)"""
     try:
-        response = llm.generate_content(prompt)
-        course_lines = [line.strip() for line in response.text.split('\n') if line.strip().startswith("코스")]
-        
-        final_courses = []
-        for line in course_lines:
-            try:
-                title_part, steps_part = line.split("|", 1)
-                course_title = title_part.split(":", 1)[1].strip().strip('[]')
-                place_names = [name.strip() for name in steps_part.split("->")]
-                
-                course_steps_details = []
-                for name in place_names:
-                    # 각 장소의 상세 정보를 가져옵니다.
-                    naver_search_result = search_naver_local(name, display=1)
-                    if naver_search_result:
-                        item = naver_search_result[0]
-                        place_name = _clean_html(item.get("title",""))
-                        place_address = item.get("roadAddress") or item.get("address", "")
-                        details = get_restaurant_details(db, place_name, place_address)
-                        if details:
-                            course_steps_details.append(schemas.RestaurantDetail(**details))
-                
-                if course_steps_details:
-                    final_courses.append(schemas.CourseDetail(title=course_title, steps=course_steps_details))
-            except Exception:
-                continue # 파싱 실패 시 해당 코스는 건너뜀
+        course_steps_details = []
+        for name in place_names:
+            details = resolved.get(name_to_place.get(name))
+            if details:
+                course_steps_details.append(schemas.RestaurantDetail(**details))
+
+        if course_steps_details:
+            return schemas.CourseDetail(title=course_title, steps=course_steps_details)
+    except Exception:
+        pass # 변환 실패 시 해당 코스는 건너뜀
+    return None
+
+def create_date_course(db: Session, request: schemas.CourseRequest, user: models.User) -> Dict[str, Any]:
+    # (공유해주신 정교한 코스 생성 로직을 여기에 통합하고,
+    # 각 장소를 get_restaurant_details로 처리하여 상세 정보를 채워넣습니다.)
+    logging.info(f"'{request.theme}' 테마의 코스 생성 요청")
+    try:
+        parsed_courses, name_to_place = _plan_courses(request)
 
+        # 각 장소의 상세 정보를 병렬로 가져옵니다.
+        resolved = _resolve_places(list(name_to_place.values()))
+
+        final_courses = [course for course in (_assemble_course(title, names, name_to_place, resolved) for title, names in parsed_courses) if course]
         return {"courses": final_courses}
     except Exception as e:
         logging.warning(f"Course generation error: {e}")
         return {"courses": []}
 
+def iter_date_course(request: schemas.CourseRequest, user: models.User) -> Iterator[Dict[str, Any]]:
+    """코스 추천 스트리밍: 코스에 포함된 장소가 모두 처리되는 대로 course 프레임을 내보내고 마지막에 summary 프레임을 내보냄"""
+    logging.info(f"'{request.theme}' 테마의 코스 생성 요청 (스트리밍)")
+    started = time.monotonic()
+    count = 0
+    try:
+        parsed_courses, name_to_place = _plan_courses(request)
+        # 코스별로 아직 처리되지 않은 장소 집합 (iter_resolved_places가 처리하지 않는 장소는 기다리지 않고,
+        # 기다릴 장소가 없는 코스는 None)
+        places = _resolvable_places(list(name_to_place.values()))
+        resolvable = set(places)
+        pending = [{name_to_place[name] for name in names if name_to_place.get(name) in resolvable} or None for _, names in parsed_courses]
+        resolved: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+
+        def completed_courses():
+            for i, (title, names) in enumerate(parsed_courses):
+                if pending[i] is not None and not pending[i]:
+                    pending[i] = None # 한 번만 내보냄
+                    course = _assemble_course(title, names, name_to_place, resolved)
+                    if course:
+                        yield course
+
+        for place, details in iter_resolved_places(places):
+            resolved[place] = details
+            for remaining in pending:
+                if remaining is not None: remaining.discard(place)
+            for course in completed_courses():
+                count += 1
+                yield {"type": "course", "data": course.dict()}
+    except Exception as e:
+        logging.warning(f"Course generation error: {e}")
+        yield {"type": "error", "message": "코스 생성 중 오류가 발생했습니다."}
+    yield {"type": "summary", "count": count, "elapsed_ms": round((time.monotonic() - started) * 1000)}
@@ -0,0 +1,187 @@
+import os
+import hashlib
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+try:
+    import fcntl  # 프로세스 간 파일 잠금 (POSIX 전용)
+except ImportError:
+    fcntl = None
+
+
+class SingleFlight:
+    """같은 키에 대한 동시 호출을 하나로 합쳐 한 번만 실행하고, 대기자 모두에게 같은 결과를 돌려준다"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            # 이미 실행 중인 호출이 있으면 그 결과(또는 예외)를 기다림
+            return call.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class KeyedFileLock:
+    """키마다 잠금 파일 하나를 두고 flock으로 잡는 프로세스(워커) 간 배타 잠금 (같은 호스트 안에서만 동작)
+
+    directory가 비어 있거나 fcntl을 쓸 수 없는 환경(Windows)에서는 아무것도 잠그지 않는다.
+    같은 프로세스 안의 동시 호출은 SingleFlight로 먼저 합친 뒤 대표 호출만 이 잠금을 잡는 것을 전제로 한다.
+    """
+
+    def __init__(self, directory: str):
+        self.enabled = bool(directory) and fcntl is not None
+        self.directory = directory
+        if directory and fcntl is None:
+            logging.warning("[SINGLEFLIGHT] fcntl을 사용할 수 없어 워커 간 잠금을 끕니다.")
+        if self.enabled:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.contended = 0
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.lock")
+
+    @contextmanager
+    def hold(self, key: str):
+        """key에 대한 잠금을 잡고 있는 동안 실행. 다른 워커가 잡고 있으면 풀릴 때까지 기다림"""
+        if not self.enabled:
+            yield
+            return
+        with open(self._path(key), "a+b") as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                contended = False
+            except BlockingIOError:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                contended = True
+            with self._lock:
+                self.acquired += 1
+                self.contended += contended
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "file", "enabled": self.enabled, "acquired": self.acquired, "contended": self.contended}
+
+
+class PgAdvisoryLock:
+    """PostgreSQL 세션 advisory lock(pg_try_advisory_lock(hashtext(key)))으로 잡는 키별 배타 잠금
+
+    같은 DB를 쓰는 모든 호스트/워커 사이에서 동작한다. 앱의 커넥션 풀을 잠금 대기로 고갈시키지 않도록
+    pool_size개짜리 전용 엔진을 따로 만들어 쓰며(동시에 잠금을 잡는 수도 pool_size로 제한됨),
+    트랜잭션을 열어 두지 않고 autocommit 커넥션에서 잠금을 폴링한다.
+    timeout 안에 커넥션이나 잠금을 얻지 못하거나 DB 오류가 나면 경고만 남기고 잠금 없이 실행한다.
+    """
+
+    POLL_INTERVAL = 0.2
+
+    def __init__(self, url: str, pool_size: int = 2, timeout: float = 30.0):
+        self.url = url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.enabled = True
+        self._engine = None
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.contended = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def _get_engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    from sqlalchemy import create_engine
+                    self._engine = create_engine(self.url, pool_size=self.pool_size, max_overflow=0,
+                                                 pool_timeout=self.timeout, pool_pre_ping=True,
+                                                 isolation_level="AUTOCOMMIT")
+        return self._engine
+
+    def _acquire(self, conn, key: str) -> bool:
+        from sqlalchemy import text
+        deadline = time.monotonic() + self.timeout
+        contended = False
+        while not conn.execute(text("SELECT pg_try_advisory_lock(hashtext(:key))"), {"key": key}).scalar():
+            contended = True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.POLL_INTERVAL)
+        with self._lock:
+            self.acquired += 1
+            self.contended += contended
+        return True
+
+    @contextmanager
+    def hold(self, key: str):
+        """key에 대한 잠금을 잡고 있는 동안 실행. 다른 워커가 잡고 있으면 timeout까지만 기다림"""
+        from sqlalchemy import text
+        conn = None
+        locked = False
+        try:
+            conn = self._get_engine().connect()
+            locked = self._acquire(conn, key)
+            if not locked:
+                logging.warning(f"[SINGLEFLIGHT] advisory lock 대기 시간 초과, 잠금 없이 진행합니다: {key}")
+                with self._lock:
+                    self.timeouts += 1
+        except Exception as e:
+            logging.warning(f"[SINGLEFLIGHT] advisory lock 획득 실패, 잠금 없이 진행합니다: {e}")
+            with self._lock:
+                self.errors += 1
+        if not locked:
+            if conn is not None:
+                conn.close()
+            yield
+            return
+        try:
+            yield
+        finally:
+            try:
+                conn.execute(text("SELECT pg_advisory_unlock(hashtext(:key))"), {"key": key})
+                conn.close()
+            except Exception as e:
+                # 세션을 끊으면 잡고 있던 잠금도 풀리므로 커넥션을 풀에 돌려보내지 않고 버림
+                logging.warning(f"[SINGLEFLIGHT] advisory lock 해제 실패, 커넥션을 폐기합니다: {e}")
+                conn.invalidate()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "pg_advisory", "enabled": self.enabled, "acquired": self.acquired,
+                    "contended": self.contended, "timeouts": self.timeouts, "errors": self.errors}
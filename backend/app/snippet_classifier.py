@@ -0,0 +1,57 @@
+import re
+from typing import List, NamedTuple, Tuple
+
+# ------------------------------
+# 리뷰 스니펫 분류기
+# ------------------------------
+# 리뷰 키워드와 광고 표시 문구를 하나의 정규식으로 합쳐 모듈 로드 시 한 번만 컴파일하고,
+# 문장마다 한 번의 스캔으로 어떤 키워드/광고 표시가 들어있는지 태깅한다.
+REVIEW_KEYWORDS = ("맛있", "추천", "별로", "최고", "불친절", "친절", "가격", "가성비", "재방문", "웨이팅", "대박", "최악",
+                   "분위기", "데이트", "오빠", "언니", "여자친구", "남자친구", "남친", "가족", "아이", "유아", "여친")
+AD_PATTERNS = (r"소정의\s*원고료", r"체험단", r"업체로부터\s*제공", r"광고\s*참고", r"협찬")
+
+MIN_SNIPPET_LENGTH = 20  # 이보다 짧은 문장은 리뷰 스니펫으로 쓰지 않음
+MAX_SNIPPETS = 20  # 페이지당 최대 스니펫 수 (긴 문장 우선)
+
+# 광고 표시를 먼저 시도하고, 키워드는 긴 것부터 시도해야 '불친절'이 '친절'보다 먼저 잡힘
+_TAGGER = re.compile(
+    "(?P<ad>" + "|".join(AD_PATTERNS) + ")|(?P<kw>" + "|".join(map(re.escape, sorted(REVIEW_KEYWORDS, key=len, reverse=True))) + ")"
+)
+_SENTENCE_SPLIT = re.compile(r"[.。!?\n]")
+
+
+class SnippetTag(NamedTuple):
+    text: str
+    keywords: Tuple[str, ...]  # 등장한 리뷰 키워드 (중복 제거, 등장 순)
+    ad_markers: Tuple[str, ...]  # 등장한 광고 표시 문구
+    is_ad: bool
+    score: int  # 서로 다른 키워드 수 (광고 문장은 0)
+
+
+def classify(sentence: str) -> SnippetTag:
+    """문장 하나를 한 번 스캔하여 리뷰 키워드와 광고 표시를 태깅"""
+    keywords, ad_markers = {}, {}
+    for match in _TAGGER.finditer(sentence):
+        if match.lastgroup == "ad":
+            ad_markers[match.group()] = None
+        else:
+            keywords[match.group()] = None
+    is_ad = bool(ad_markers)
+    return SnippetTag(sentence, tuple(keywords), tuple(ad_markers), is_ad, 0 if is_ad else len(keywords))
+
+
+def is_ad_text(text: str) -> bool:
+    """광고/협찬 표시 문구가 들어있는지 여부 (사용자 리뷰의 is_ad 판정에 사용)"""
+    return any(match.lastgroup == "ad" for match in _TAGGER.finditer(text or ""))
+
+
+def classify_text(text: str, min_length: int = MIN_SNIPPET_LENGTH, limit: int = MAX_SNIPPETS) -> List[SnippetTag]:
+    """본문을 문장 단위로 나눠 리뷰 키워드가 있는 문장만 태깅하여 반환 (중복 제거, 긴 문장 우선 limit개)
+
+    광고 문장도 is_ad=True로 함께 반환하므로 호출하는 쪽에서 걸러내거나 비율을 계산할 수 있다.
+    같은 본문이면 항상 같은 결과가 나오도록 길이가 같은 문장은 문장 내용 순으로 정렬한다.
+    """
+    sentences = dict.fromkeys(s.strip() for s in _SENTENCE_SPLIT.split(text or ""))
+    tags = [classify(s) for s in sentences if len(s) > min_length]
+    tagged = [tag for tag in tags if tag.keywords]
+    return sorted(tagged, key=lambda tag: (-len(tag.text), tag.text))[:limit]
@@ -0,0 +1,198 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# ------------------------------
+# 형태소 분석 백엔드 설정 (환경 변수로 조정 가능)
+# ------------------------------
+# okt: 기존과 동일한 결과 (JPype로 JVM 호출), kiwi: kiwipiepy 기반 프로세스 내 C++ 분석기,
+# simple: 형태소 분석 없이 조사만 떼어내는 순수 Python 모드 (이후 임베딩 모델의 서브워드 토크나이저에 맡김)
+TOKENIZER_BACKEND = os.getenv("TOKENIZER_BACKEND", "okt")
+TOKENIZE_CACHE_SIZE = int(os.getenv("TOKENIZE_CACHE_SIZE", "8192"))
+
+# 불용어 (필요에 따라 계속 추가 가능)
+STOPWORDS = frozenset(['하다', '있다', '되다', '그', '않다', '없다', '나', '말', '사람', '이', '보다', '등', '같다', '것'])
+# 한글, 공백 외 문자 제거용
+_NON_HANGUL = re.compile(r"[^ㄱ-ㅎㅏ-ㅣ가-힣\s]")
+
+
+def clean_text(text: str) -> str:
+    return _NON_HANGUL.sub("", text or "")
+
+
+def _keep(word: str) -> bool:
+    return word not in STOPWORDS and len(word) > 1
+
+
+class OktTokenizer:
+    """Okt(open-korean-text) 백엔드: 명사/형용사/동사만 원형으로 추출"""
+    name = "okt"
+    _MEANINGFUL_POS = frozenset(['Noun', 'Adjective', 'Verb'])
+
+    def __init__(self):
+        self._okt = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        # JVM은 fork 이후 자식 프로세스에서 사용할 수 없으므로 워커마다 처음 사용할 때 기동
+        if self._okt is None:
+            with self._lock:
+                if self._okt is None:
+                    from konlpy.tag import Okt
+                    self._okt = Okt()
+        return self._okt
+
+    @property
+    def loaded(self) -> bool:
+        return self._okt is not None
+
+    def tokenize(self, text: str) -> List[str]:
+        tokens = self.load().pos(text, stem=True)
+        return [word for word, pos in tokens if pos in self._MEANINGFUL_POS and _keep(word)]
+
+    def tokenize_batch(self, texts: List[str]) -> List[List[str]]:
+        return [self.tokenize(text) for text in texts]
+
+
+class KiwiTokenizer:
+    """Kiwi(kiwipiepy) 백엔드: JVM 없이 프로세스 내에서 동작하는 C++ 형태소 분석기
+
+    Okt의 stem=True 결과와 맞추기 위해 동사/형용사 어간에는 '다'를 붙여 원형으로 만든다.
+    """
+    name = "kiwi"
+    _NOUN_TAGS = frozenset(['NNG', 'NNP'])
+    _PREDICATE_TAGS = frozenset(['VV', 'VA', 'VV-I', 'VV-R', 'VA-I', 'VA-R'])
+
+    def __init__(self):
+        self._kiwi = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._kiwi is None:
+            with self._lock:
+                if self._kiwi is None:
+                    try:
+                        from kiwipiepy import Kiwi
+                    except ImportError:
+                        raise RuntimeError("kiwi 백엔드를 사용하려면 'pip install kiwipiepy'를 실행해주세요.")
+                    self._kiwi = Kiwi()
+        return self._kiwi
+
+    @property
+    def loaded(self) -> bool:
+        return self._kiwi is not None
+
+    def _words(self, tokens) -> List[str]:
+        words = []
+        for token in tokens:
+            if token.tag in self._NOUN_TAGS:
+                word = token.form
+            elif token.tag in self._PREDICATE_TAGS:
+                word = token.form + '다'
+            else:
+                continue
+            if _keep(word):
+                words.append(word)
+        return words
+
+    def tokenize(self, text: str) -> List[str]:
+        return self._words(self.load().tokenize(text))
+
+    def tokenize_batch(self, texts: List[str]) -> List[List[str]]:
+        # Kiwi는 여러 문장을 한 번에 넘기면 내부적으로 묶어서 처리
+        return [self._words(tokens) for tokens in self.load().tokenize(texts)]
+
+
+class SimpleTokenizer:
+    """형태소 분석 없이 공백 단위로 나누고 흔한 조사만 떼어내는 순수 Python 백엔드"""
+    name = "simple"
+    # 긴 조사부터 확인해야 '에서'가 '서'보다 먼저 잘림
+    _JOSA = tuple(sorted(['은', '는', '이', '가', '을', '를', '에', '에서', '으로', '로', '와', '과', '도', '만', '의',
+                          '께서', '한테', '에게', '까지', '부터', '이랑', '랑', '이나', '나', '보다'], key=len, reverse=True))
+
+    loaded = True
+
+    def load(self):
+        return self
+
+    def _strip_josa(self, word: str) -> str:
+        for josa in self._JOSA:
+            if word.endswith(josa) and len(word) - len(josa) >= 2:
+                return word[:-len(josa)]
+        return word
+
+    def tokenize(self, text: str) -> List[str]:
+        return [w for w in (self._strip_josa(word) for word in text.split()) if _keep(w)]
+
+    def tokenize_batch(self, texts: List[str]) -> List[List[str]]:
+        return [self.tokenize(text) for text in texts]
+
+
+BACKENDS = {cls.name: cls for cls in (OktTokenizer, KiwiTokenizer, SimpleTokenizer)}
+_instances: Dict[str, object] = {}
+_instances_lock = threading.Lock()
+
+
+def get_tokenizer(name: str = TOKENIZER_BACKEND):
+    """이름으로 토크나이저 백엔드를 반환 (백엔드마다 프로세스당 하나)"""
+    if name not in BACKENDS:
+        raise ValueError(f"지원하지 않는 토크나이저 백엔드입니다: {name} (가능: {', '.join(BACKENDS)})")
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = BACKENDS[name]()
+        return _instances[name]
+
+
+class _TokenizationCache:
+    """(백엔드, 원문) → 전처리 결과 LRU 캐시"""
+
+    def __init__(self, maxsize: int = TOKENIZE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[str]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Tuple[str, str], value: str):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+tokenization_cache = _TokenizationCache()
+
+
+def preprocess(text: str, backend: str = TOKENIZER_BACKEND) -> str:
+    """텍스트 정제 + 형태소 분석 + 불용어 제거 결과를 공백으로 이어 반환 (반복 텍스트는 캐시 사용)"""
+    return preprocess_batch([text], backend)[0]
+
+
+def preprocess_batch(texts: List[str], backend: str = TOKENIZER_BACKEND) -> List[str]:
+    """여러 텍스트를 한 번에 전처리 (중복 제거 후 캐시에 없는 것만 백엔드의 배치 분석 사용)"""
+    results: Dict[str, str] = {}
+    missing: List[str] = []
+    for text in dict.fromkeys(texts):
+        cached = tokenization_cache.get((backend, text))
+        if cached is None:
+            missing.append(text)
+        else:
+            results[text] = cached
+    if missing:
+        tokenized = get_tokenizer(backend).tokenize_batch([clean_text(text) for text in missing])
+        for text, tokens in zip(missing, tokenized):
+            results[text] = " ".join(tokens)
+            tokenization_cache.set((backend, text), results[text])
+    return [results[text] for text in texts]
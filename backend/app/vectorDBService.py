@@ -1,61 +1,96 @@
-from typing import List, Dict, Any
-from .database import get_vector_db_collection
+import os
+import logging
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from . import metadata_codec
+from .vector_store import get_vector_store, PgVectorStore
+from .detail_cache import detail_cache
 
-# database.py에서 설정한 벡터 DB 컬렉션 가져오기
-collection = get_vector_db_collection()
+UPSERT_CHUNK_SIZE = int(os.getenv("VECTOR_UPSERT_CHUNK_SIZE", "500")) # 한 번의 upsert 트랜잭션에 넣을 맛집 수
+
+# 벡터 저장소 백엔드(chroma/pgvector/numpy/hnsw)는 vector_store.py에서 설정에 따라 프로세스당 한 번만 열립니다
 
 def upsert_restaurant(restaurant_id: str, vector: List[float], metadata: Dict[str, Any]):
-    """맛집의 벡터와 메타데이터(요약 정보 등)를 ChromaDB에 저장하거나 업데이트"""
-    # ChromaDB는 리스트 형태 메타데이터 지원하지 않음, 문자열로 변환 필요
-    senitized_metadata = {}
-    for key, value in metadata.items():
-        if isinstance(value, list):
-            senitized_metadata[key] = '|'.join(value)
-        else:
-            senitized_metadata[key] = value
-            
-    collection.upsert(
-        ids=[restaurant_id],
-        embeddings=[vector],
-        metadatas=[senitized_metadata]
-    )
-    print(f"Restaurant ID {restaurant_id} 벡터 정보가 ChromaDB에 업데이트 되었습니다.")
+    """맛집의 벡터와 메타데이터(요약 정보 등)를 벡터 저장소에 저장하거나 업데이트"""
+    upsert_restaurants_bulk([(restaurant_id, vector, metadata)])
+
+def upsert_restaurants_bulk(items: Sequence[Tuple[str, List[float], Dict[str, Any]]], chunk_size: int = UPSERT_CHUNK_SIZE) -> int:
+    """여러 맛집의 (id, 벡터, 메타데이터)를 chunk_size개씩 묶어 한 번의 upsert로 저장하고 저장한 개수를 반환"""
+    if not items: return 0
+    store = get_vector_store()
+    total = 0
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        ids, vectors, metadatas = zip(*chunk)
+        store.upsert(list(ids), [list(v) for v in vectors], metadata_codec.encode_many(metadatas))
+        # 저장과 동시에 상세 정보 캐시도 갱신 (write-through)
+        for restaurant_id, metadata in zip(ids, metadatas):
+            detail_cache.put(restaurant_id, metadata)
+        total += len(chunk)
+    logging.info(f"{total}개 맛집 벡터 정보가 벡터 저장소({store.name})에 업데이트 되었습니다.")
+    return total
     
 def query_similar_restaurants(vector: List[float], n_results: int = 3) -> List[Dict[str, Any]]:
-    results = collection.query(
-        query_embeddings=[vector],
-        n_results=n_results
-    )
-    
-    # DB에서 |로 구분된 문자열을 다시 리스트로 변환하여 반환합니다.
-    final_results = []
-    if results and results.get('metadatas'):
-        for metadata in results['metadatas'][0]:
-            if metadata.get('summary_pros'):
-                metadata['summary_pros'] = metadata['summary_pros'].split('|')
-            if metadata.get('summary_cons'):
-                metadata['summary_cons'] = metadata['summary_cons'].split('|')
-            if metadata.get('keywords'):
-                metadata['keywords'] = metadata['keywords'].split('|')
-            if metadata.get('nearby_attractions'):
-                metadata['nearby_attractions'] = metadata['nearby_attractions'].split('|')
-            if metadata.get('signature_menu'):
-                metadata['signature_menu'] = metadata['signature_menu'].split('|')
-            if metadata.get('categories'):
-                metadata['categories'] = metadata['categories'].split('|')
-            if metadata.get('summary_paring'):
-                metadata['summary_parking'] = metadata['summary_parking'].split('|')
-            if metadata.get('summary_price'):
-                metadata['summary_price'] = metadata['summary_price'].split('|')
-            if metadata.get('summary_opening_hours'):
-                metadata['summary_opening_hours'] = metadata['summary_opening_hours'].split('|')
-            if metadata.get('summary_phone'):
-                metadata['summary_phone'] = metadata['summary_phone'].split('|')
-            final_results.append(metadata)
-                        
-    return final_results
+    return query_similar_restaurants_batch([vector], n_results=n_results)[0]
+
+def query_similar_restaurants_batch(vectors: Sequence[List[float]], n_results: int = 3, where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+    """여러 벡터를 한 번의 질의로 검색하여 질의별 결과 목록을 반환"""
+    if not vectors: return []
+    results = get_vector_store().query([list(v) for v in vectors], n_results, where=where)
+    return [[metadata_codec.decode(metadata) for metadata in per_query] for per_query in results]
+
+def query_similar_restaurants_filtered(vector: List[float], n_results: int = 3, region: Optional[str] = None,
+                                       category: Optional[str] = None, price_range: Optional[str] = None,
+                                       min_trust_score: Optional[int] = None) -> List[Dict[str, Any]]:
+    """유사 맛집을 지역/카테고리/가격대/신뢰도 조건으로 걸러서 검색
+
+    pgvector 백엔드는 k-NN과 필터를 SQL 한 문장으로 처리하고, 그 외 백엔드는 후보를 넉넉히 뽑아 걸러낸다.
+    """
+    store = get_vector_store()
+    filters = {"region": region, "category": category, "price_range": price_range, "min_trust_score": min_trust_score}
+    if isinstance(store, PgVectorStore):
+        return [metadata_codec.decode(m) for m in store.query_filtered(vector, n_results, **filters)]
+
+    def matches(metadata: Dict[str, Any]) -> bool:
+        cols = metadata_codec.filter_fields(metadata)
+        return ((not region or (cols["region"] or "").startswith(region))
+                and (not category or cols["category"] == category)
+                and (not price_range or price_range in (cols["price_range"] or ""))
+                and (min_trust_score is None or (cols["review_trust_score"] or 0) >= min_trust_score))
+
+    candidates = store.query([list(vector)], n_results * 10)[0]
+    return [metadata_codec.decode(m) for m in candidates if matches(m)][:n_results]
+
+def make_restaurant_id(name: str, address: str) -> str:
+    """맛집의 정규 ID ("이름_주소", 앞뒤/중복 공백 제거)"""
+    return f"{' '.join((name or '').split())}_{' '.join((address or '').split())}"
+
+def link_restaurant(restaurant_id: str, restaurant_pk: int):
+    """벡터 저장소의 맛집 항목을 PostgreSQL restaurants 행(id)과 연결 (pgvector 백엔드에서만 저장됨)"""
+    get_vector_store().link_restaurants({restaurant_id: restaurant_pk})
+
+def get_restaurant_by_id(restaurant_id: str, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """맛집 상세 정보를 반환 (메모리 캐시 우선, 없으면 벡터 저장소에서 읽어 디코딩 후 캐시)
+
+    use_cache=False면 다른 워커가 방금 쓴 내용을 보기 위해 메모리 캐시를 건너뛰고 저장소에서 읽는다.
+    """
+    detail = detail_cache.get(restaurant_id) if use_cache else None
+    if detail is not None:
+        return detail
+    metadata = get_vector_store().get([restaurant_id])[0]
+    if metadata is None:
+        return None
+    detail = metadata_codec.decode(metadata)
+    detail_cache.put(restaurant_id, detail)
+    return detail
+
+def detail_cache_stats() -> Dict[str, Any]:
+    """상세 정보 캐시의 적중/미스/축출 횟수"""
+    return detail_cache.stats()
 
 def check_restaurant_exists(restaurant_id: str) -> bool:
     """벡터 DB에 해당 맛집 정보가 이미 있는지 확인합니다."""
-    result = collection.get(ids=[restaurant_id])
-    return bool(result['ids'])
\ No newline at end of file
+    return get_vector_store().get([restaurant_id])[0] is not None
+
+def vector_store_stats() -> Dict[str, Any]:
+    """현재 벡터 저장소 백엔드의 항목 수, 메모리, 지연 시간 지표"""
+    return get_vector_store().stats()
\ No newline at end of file
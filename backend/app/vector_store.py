@@ -0,0 +1,442 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from .metadata_codec import FILTER_FIELDS, INDEXED_FIELDS, filter_fields
+
+# ------------------------------
+# 벡터 저장소 설정 (환경 변수로 조정 가능)
+# ------------------------------
+# chroma: ChromaDB PersistentClient, pgvector: PostgreSQL(pgvector) 테이블,
+# numpy: 프로세스 내 전수 비교(flat) 인덱스, hnsw: 프로세스 내 hnswlib 근사 인덱스
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "chroma")
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "")  # 비워두면 백엔드별 기본 경로 사용
+VECTOR_COLLECTION_NAME = "restaurants"
+PGVECTOR_EF_SEARCH = int(os.getenv("PGVECTOR_EF_SEARCH", "40"))  # HNSW 검색 시 후보 수 (클수록 정확/느림)
+NUMPY_STORE_COMPACT_MIN = int(os.getenv("NUMPY_STORE_COMPACT_MIN", "1000"))  # 변경 로그가 이 수(와 전체 항목 수)를 넘으면 .npz로 합침
+
+_LATENCY_WINDOW = 1000  # 지연 시간 통계에 사용할 최근 호출 수
+
+
+class VectorStore:
+    """맛집 벡터 저장소 공통 인터페이스
+
+    메타데이터는 문자열/숫자/불리언 값만 담긴 평탄한 dict로 주고받는다 (직렬화는 metadata_codec 담당).
+    where는 {"필드": 값} 형태의 동등 조건만 모든 백엔드에서 지원하며, 필드는 별도 스칼라로 저장되는
+    metadata_codec.INDEXED_FIELDS만 쓸 수 있다 (나머지는 JSON 문서 안에 있어 조건이 아무것도 걸러내지 못함).
+    """
+    name = "base"
+
+    def __init__(self):
+        self._latencies: Dict[str, deque] = {}
+        self._stats_lock = threading.Lock()
+
+    @contextmanager
+    def _timed(self, op: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            with self._stats_lock:
+                self._latencies.setdefault(op, deque(maxlen=_LATENCY_WINDOW)).append(elapsed)
+
+    def upsert(self, ids: List[str], vectors: List[List[float]], metadatas: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def query(self, vectors: List[List[float]], n_results: int, where: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        raise NotImplementedError
+
+    def get(self, ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """id 순서대로 메타데이터를 반환 (없는 id는 None)"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def link_restaurants(self, links: Dict[str, int]):
+        """벡터 저장소 ID → PostgreSQL restaurants.id 연결 (연결 컬럼이 있는 백엔드만 사용)"""
+
+    def memory_bytes(self) -> int:
+        """인덱스가 차지하는 메모리(또는 저장 공간) 추정치"""
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        """백엔드 선택을 위한 지표: 항목 수, 메모리 추정치, 연산별 평균/p95 지연(ms)"""
+        latency = {}
+        with self._stats_lock:
+            for op, samples in self._latencies.items():
+                ordered = sorted(samples)
+                latency[op] = {
+                    "calls": len(ordered),
+                    "avg_ms": round(sum(ordered) / len(ordered), 3),
+                    "p95_ms": round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 3),
+                }
+        return {"backend": self.name, "count": self.count(), "memory_bytes": self.memory_bytes(), "latency": latency}
+
+
+def _check_where(where: Optional[Dict[str, Any]]):
+    unsupported = sorted(set(where or {}) - set(INDEXED_FIELDS))
+    if unsupported:
+        raise ValueError(f"where 조건에 쓸 수 없는 필드입니다: {unsupported} (가능: {', '.join(INDEXED_FIELDS)})")
+
+
+def _matches(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    return not where or all(metadata.get(k) == v for k, v in where.items())
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(root, f))
+            except OSError:
+                pass
+    return total
+
+
+class ChromaStore(VectorStore):
+    name = "chroma"
+
+    def __init__(self, path: str = "./chroma_db_storage", collection_name: str = VECTOR_COLLECTION_NAME):
+        super().__init__()
+        import chromadb
+        self.path = path
+        self._client = chromadb.PersistentClient(path=path)
+        self._collection = self._client.get_or_create_collection(name=collection_name)
+
+    def upsert(self, ids, vectors, metadatas):
+        with self._timed("upsert"):
+            self._collection.upsert(ids=ids, embeddings=vectors, metadatas=metadatas)
+
+    def query(self, vectors, n_results, where=None):
+        _check_where(where)
+        query_args = {"query_embeddings": vectors, "n_results": n_results}
+        if where:
+            query_args["where"] = where
+        with self._timed("query"):
+            results = self._collection.query(**query_args)
+        if not results or not results.get('metadatas'):
+            return [[] for _ in vectors]
+        return results['metadatas']
+
+    def get(self, ids):
+        with self._timed("get"):
+            result = self._collection.get(ids=ids)
+        found = dict(zip(result.get('ids') or [], result.get('metadatas') or []))
+        return [found.get(i) for i in ids]
+
+    def count(self):
+        return self._collection.count()
+
+    def iter_all(self, batch_size: int = 500):
+        """저장된 모든 (ids, 벡터, 메타데이터)를 batch_size개씩 반환 (다른 백엔드로 이전할 때 사용)"""
+        offset = 0
+        while True:
+            result = self._collection.get(include=["embeddings", "metadatas"], limit=batch_size, offset=offset)
+            ids = result.get("ids") or []
+            if not ids:
+                break
+            yield ids, [list(v) for v in result["embeddings"]], result["metadatas"]
+            offset += len(ids)
+
+    def memory_bytes(self):
+        # HNSW 인덱스와 SQLite 파일을 포함한 디스크 사용량
+        return _dir_size(self.path)
+
+
+class NumpyFlatStore(VectorStore):
+    """프로세스 내 전수 비교 인덱스 (정규화된 float32 행렬 @ 질의 벡터)
+
+    수만 건 이하의 말뭉치에서는 별도 서버 없이 가장 빠르며, path를 주면 .npz 스냅숏 + 추가 전용 변경 로그(.log)로
+    영속화한다. upsert는 로그에 변경분만 덧붙이고, 로그가 충분히 커졌을 때만 전체를 .npz로 다시 쓴다.
+
+    단일 프로세스 전용: 각 프로세스가 자기 메모리 사본을 가지므로 여러 워커가 같은 파일에 쓰면 서로의 변경을
+    덮어쓴다. 멀티 워커 배포에서는 chroma 또는 pgvector 백엔드를 사용할 것.
+    """
+    name = "numpy"
+
+    def __init__(self, path: str = "./vector_store.npz"):
+        super().__init__()
+        import numpy as np
+        self._np = np
+        self.path = path
+        self._lock = threading.RLock()
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._metadatas: List[Dict[str, Any]] = []
+        self._matrix = None  # (n, dim) 정규화된 float32
+        self._log_path = path + ".log" if path else ""
+        self._log_entries = 0
+        if path:
+            self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            data = self._np.load(self.path, allow_pickle=False)
+            self._ids = [str(i) for i in data["ids"]]
+            self._metadatas = json.loads(str(data["metadatas"]))
+            self._matrix = data["matrix"].astype(self._np.float32)
+            self._index = {rid: i for i, rid in enumerate(self._ids)}
+        if os.path.exists(self._log_path):
+            # 마지막 스냅숏 이후의 변경분을 다시 적용 (같은 항목을 두 번 적용해도 결과는 같음)
+            with open(self._log_path, encoding="utf-8") as f:
+                entries = [json.loads(line) for line in f if line.strip()]
+            if entries:
+                self._apply([e["id"] for e in entries], self._np.asarray([e["v"] for e in entries], dtype=self._np.float32),
+                            [e["m"] for e in entries])
+            self._log_entries = len(entries)
+
+    def _save(self):
+        """현재 상태 전체를 .npz 스냅숏으로 쓰고 변경 로그를 비움"""
+        if not self.path or self._matrix is None:
+            return
+        tmp = self.path + ".tmp.npz"
+        self._np.savez(tmp, ids=self._np.array(self._ids), matrix=self._matrix,
+                       metadatas=self._np.array(json.dumps(self._metadatas, ensure_ascii=False)))
+        os.replace(tmp, self.path)
+        open(self._log_path, "w").close()
+        self._log_entries = 0
+
+    def _append_log(self, ids, rows, metadatas):
+        if not self.path:
+            return
+        with open(self._log_path, "a", encoding="utf-8") as f:
+            for rid, row, metadata in zip(ids, rows, metadatas):
+                f.write(json.dumps({"id": rid, "v": row.tolist(), "m": metadata}, ensure_ascii=False) + "\n")
+        self._log_entries += len(ids)
+        if self._log_entries > max(NUMPY_STORE_COMPACT_MIN, len(self._ids)):
+            self._save()
+
+    def _normalize(self, vectors):
+        arr = self._np.asarray(vectors, dtype=self._np.float32)
+        norms = self._np.linalg.norm(arr, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return arr / norms
+
+    def _apply(self, ids, rows, metadatas):
+        # 한 번의 호출 안에서 같은 id가 반복되면 마지막 값만 반영
+        last = {rid: k for k, rid in enumerate(ids)}
+        new_ids, new_rows, new_metadatas = [], [], []
+        for rid, k in last.items():
+            pos = self._index.get(rid)
+            if pos is None:
+                self._index[rid] = len(self._ids) + len(new_ids)
+                new_ids.append(rid)
+                new_rows.append(rows[k])
+                new_metadatas.append(metadatas[k])
+            else:
+                self._matrix[pos] = rows[k]
+                self._metadatas[pos] = metadatas[k]
+        if new_rows:
+            stacked = self._np.stack(new_rows)
+            self._matrix = stacked if self._matrix is None else self._np.vstack([self._matrix, stacked])
+            self._ids.extend(new_ids)
+            self._metadatas.extend(new_metadatas)
+        self._on_change()
+        return list(last.values())
+
+    def upsert(self, ids, vectors, metadatas):
+        with self._timed("upsert"), self._lock:
+            rows = self._normalize(vectors)
+            kept = self._apply(ids, rows, metadatas)
+            self._append_log([ids[k] for k in kept], rows[kept], [metadatas[k] for k in kept])
+
+    def _on_change(self):
+        pass
+
+    def _candidates(self, queries, n):
+        """질의별 (행 번호 목록)을 유사도 내림차순으로 반환"""
+        scores = queries @ self._matrix.T
+        n = min(n, scores.shape[1])
+        top = self._np.argpartition(-scores, n - 1, axis=1)[:, :n]
+        order = self._np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+        return self._np.take_along_axis(top, order, axis=1)
+
+    def query(self, vectors, n_results, where=None):
+        _check_where(where)
+        with self._timed("query"), self._lock:
+            if self._matrix is None or not self._ids:
+                return [[] for _ in vectors]
+            queries = self._normalize(vectors)
+            # 필터가 있으면 더 많이 뽑은 뒤 조건에 맞는 것만 남김
+            fetch = len(self._ids) if where else n_results
+            results = []
+            for rows in self._candidates(queries, fetch):
+                hits = [self._metadatas[i] for i in rows if _matches(self._metadatas[i], where)]
+                results.append(hits[:n_results])
+            return results
+
+    def get(self, ids):
+        with self._timed("get"), self._lock:
+            return [self._metadatas[self._index[i]] if i in self._index else None for i in ids]
+
+    def count(self):
+        return len(self._ids)
+
+    def memory_bytes(self):
+        with self._lock:
+            matrix = self._matrix.nbytes if self._matrix is not None else 0
+            return matrix + len(json.dumps(self._metadatas, ensure_ascii=False).encode("utf-8"))
+
+
+class HnswStore(NumpyFlatStore):
+    """NumpyFlatStore에 hnswlib 근사 최근접 인덱스를 얹은 백엔드 (대규모 말뭉치용)"""
+    name = "hnsw"
+
+    def __init__(self, path: str = "./vector_store.npz", m: int = 16, ef_construction: int = 200, ef: int = 64):
+        try:
+            import hnswlib
+        except ImportError:
+            raise RuntimeError("hnsw 백엔드를 사용하려면 'pip install hnswlib'를 실행해주세요.")
+        self._hnswlib = hnswlib
+        self.m, self.ef_construction, self.ef = m, ef_construction, ef
+        self._hnsw = None
+        super().__init__(path)
+
+    def _on_change(self):
+        # 변경이 생기면 다음 질의 때 인덱스를 다시 만든다 (대량 적재 후 한 번만 빌드되도록)
+        self._hnsw = None
+
+    def _build(self):
+        index = self._hnswlib.Index(space="ip", dim=self._matrix.shape[1])
+        index.init_index(max_elements=max(len(self._ids), 1), M=self.m, ef_construction=self.ef_construction)
+        index.add_items(self._matrix, self._np.arange(len(self._ids)))
+        index.set_ef(self.ef)
+        self._hnsw = index
+
+    def _candidates(self, queries, n):
+        if self._hnsw is None:
+            self._build()
+        n = min(n, len(self._ids))
+        self._hnsw.set_ef(max(self.ef, n))
+        labels, _ = self._hnsw.knn_query(queries, k=n)
+        return labels
+
+    def memory_bytes(self):
+        extra = 0
+        if self._hnsw is not None:
+            # 각 노드의 링크(평균 2*M개, 4바이트) 추정치
+            extra = len(self._ids) * self.m * 2 * 4
+        return super().memory_bytes() + extra
+
+
+class PgVectorStore(VectorStore):
+    """PostgreSQL pgvector 백엔드 (models.RestaurantEmbedding 테이블 사용)"""
+    name = "pgvector"
+
+    def __init__(self):
+        super().__init__()
+        from . import models
+        from .database import SessionLocal, engine, enable_pgvector
+        self._model = models.RestaurantEmbedding
+        self._session_factory = SessionLocal
+        enable_pgvector(engine)
+        models.RestaurantEmbedding.__table__.create(bind=engine, checkfirst=True)
+
+    def upsert(self, ids, vectors, metadatas):
+        from sqlalchemy.dialects.postgresql import insert
+        rows = [
+            {"id": i, "embedding": list(v), "metadata_json": m, **filter_fields(m)}
+            for i, v, m in zip(ids, vectors, metadatas)
+        ]
+        stmt = insert(self._model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self._model.id],
+            set_={col: stmt.excluded[col] for col in ("embedding", "metadata_json") + FILTER_FIELDS},
+        )
+        with self._timed("upsert"), self._session_factory() as db:
+            db.execute(stmt)
+            db.commit()
+
+    def link_restaurants(self, links):
+        # restaurants 행은 벡터 저장 이후에 만들어지므로, 생성된 행의 id를 받아 별도로 연결한다
+        if not links:
+            return
+        from sqlalchemy import update
+        with self._session_factory() as db:
+            for embedding_id, restaurant_pk in links.items():
+                db.execute(update(self._model).where(self._model.id == embedding_id).values(restaurant_id=restaurant_pk))
+            db.commit()
+
+    def _set_ef_search(self, db):
+        from sqlalchemy import text
+        db.execute(text(f"SET LOCAL hnsw.ef_search = {int(PGVECTOR_EF_SEARCH)}"))
+
+    def query(self, vectors, n_results, where=None):
+        _check_where(where)
+        results = []
+        with self._timed("query"), self._session_factory() as db:
+            self._set_ef_search(db)
+            for vector in vectors:
+                q = db.query(self._model.metadata_json)
+                for key, value in (where or {}).items():
+                    if key in FILTER_FIELDS:
+                        q = q.filter(getattr(self._model, key) == value)
+                    else:
+                        # 표시용 필드(이름/주소 등)는 인코딩된 메타데이터의 최상위 스칼라로 저장됨
+                        q = q.filter(self._model.metadata_json[key].astext == str(value))
+                q = q.order_by(self._model.embedding.cosine_distance(list(vector))).limit(n_results)
+                results.append([row[0] for row in q.all()])
+        return results
+
+    def query_filtered(self, vector: List[float], n_results: int = 3, **filters) -> List[Dict[str, Any]]:
+        """k-NN과 지역/카테고리/가격대/신뢰도 필터를 SQL 한 문장으로 실행하여 메타데이터 목록을 반환"""
+        from . import crud
+        with self._timed("query_filtered"), self._session_factory() as db:
+            self._set_ef_search(db)
+            return [row.metadata_json for row in crud.search_similar_restaurants(db, vector, n_results=n_results, **filters)]
+
+    def get(self, ids):
+        with self._timed("get"), self._session_factory() as db:
+            rows = db.query(self._model.id, self._model.metadata_json).filter(self._model.id.in_(ids)).all()
+        found = dict(rows)
+        return [found.get(i) for i in ids]
+
+    def count(self):
+        with self._session_factory() as db:
+            return db.query(self._model).count()
+
+    def memory_bytes(self):
+        from sqlalchemy import text
+        with self._session_factory() as db:
+            return db.execute(text("SELECT pg_total_relation_size(:t)"), {"t": self._model.__tablename__}).scalar() or 0
+
+
+def _open(backend: str) -> VectorStore:
+    if backend == "chroma":
+        return ChromaStore(VECTOR_STORE_PATH or "./chroma_db_storage")
+    if backend == "numpy":
+        return NumpyFlatStore(VECTOR_STORE_PATH or "./vector_store.npz")
+    if backend == "hnsw":
+        return HnswStore(VECTOR_STORE_PATH or "./vector_store.npz")
+    if backend == "pgvector":
+        return PgVectorStore()
+    raise ValueError(f"지원하지 않는 벡터 저장소 백엔드입니다: {backend} (가능: chroma, pgvector, numpy, hnsw)")
+
+
+_store: Optional[VectorStore] = None
+_store_pid: Optional[int] = None
+_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStore:
+    """설정(VECTOR_STORE_BACKEND)에 따른 벡터 저장소를 프로세스당 한 번만 열어 반환"""
+    global _store, _store_pid
+    if _store is None or _store_pid != os.getpid():
+        with _store_lock:
+            if _store is None or _store_pid != os.getpid():
+                _store = _open(VECTOR_STORE_BACKEND)
+                _store_pid = os.getpid()
+                logging.info(f"[VECTOR STORE] '{_store.name}' 백엔드 사용")
+    return _store
+
+
+def is_vector_store_loaded() -> bool:
+    return _store is not None and _store_pid == os.getpid()
@@ -0,0 +1,61 @@
+import gc
+import os
+import logging
+import threading
+from typing import Dict
+
+from . import nlpService
+from .vector_store import get_vector_store, is_vector_store_loaded
+
+# ------------------------------
+# 무거운 컴포넌트 초기화 설정
+# ------------------------------
+# CUREAT_PRELOAD=1: 워커를 fork하기 전(gunicorn --preload) 마스터 프로세스에서 모델 가중치를 미리 로드하여
+# 모든 워커가 copy-on-write로 같은 메모리를 공유하도록 함
+CUREAT_PRELOAD = os.getenv("CUREAT_PRELOAD", "0") == "1"
+# WARMUP_ON_STARTUP=1: 워커 기동 직후 백그라운드에서 모델/Okt/벡터 DB를 미리 로드
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+_database_ready = False
+
+
+def mark_database_ready():
+    global _database_ready
+    _database_ready = True
+
+
+def preload_shared():
+    """fork 전에 공유할 컴포넌트(모델 가중치)만 로드
+
+    형태소 분석기(Okt의 JVM)와 벡터 저장소 클라이언트는 fork 이후 자식 프로세스에서 안전하게 쓸 수 없으므로 제외한다.
+    """
+    logging.info("[WARMUP] fork 전 임베딩 모델 사전 로드")
+    nlpService.get_vector_model()
+    # 이후 생성되는 객체만 GC 대상으로 삼아, GC가 공유 페이지를 건드려 복사가 일어나는 것을 줄임
+    gc.freeze()
+
+
+def warm_worker():
+    """현재 워커 프로세스에서 모든 무거운 컴포넌트를 로드"""
+    for name, loader in (("vector_model", nlpService.get_vector_model), ("tokenizer", lambda: nlpService.get_tokenizer().load()), ("vector_db", get_vector_store)):
+        try:
+            loader()
+        except Exception as e:
+            logging.warning(f"[WARMUP] {name} 로드 실패: {e}")
+    logging.info(f"[WARMUP] 완료: {status()}")
+
+
+def start_background_warmup() -> threading.Thread:
+    thread = threading.Thread(target=warm_worker, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def status() -> Dict[str, bool]:
+    """각 무거운 컴포넌트가 현재 프로세스에서 로드되었는지 여부"""
+    return {
+        "database": _database_ready,
+        "vector_model": nlpService.is_vector_model_loaded(),
+        "tokenizer": nlpService.is_tokenizer_loaded(),
+        "vector_db": is_vector_store_loaded(),
+    }
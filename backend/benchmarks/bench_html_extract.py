@@ -0,0 +1,95 @@
+"""HTML 본문 추출 벤치마크: 파서 백엔드별 처리량(pages/s)과 기존 구현(html.parser) 대비 추출 텍스트 일치율 비교
+
+실행: python -m backend.benchmarks.bench_html_extract [--corpus 저장한_html_디렉터리] [--pages 200] [--workers 4]
+--corpus를 주지 않으면 backend_test의 맛집 데이터로 블로그 형태의 페이지를 만들어 사용한다.
+"""
+import os
+import json
+import time
+import random
+import difflib
+import argparse
+from typing import List
+
+from backend.app import html_extract
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "backend_test")
+
+PAGE_TEMPLATE = """<html><head><meta charset="utf-8"><title>{title}</title></head><body>
+<div class="gnb">{nav}</div>
+<div id="post"><h2>{title}</h2>{paragraphs}</div>
+<div class="sidebar"><ul>{sidebar}</ul></div>
+<div class="footer">Copyright 블로그 All rights reserved.</div>
+</body></html>"""
+
+
+def load_corpus(path: str) -> List[str]:
+    pages = []
+    for name in sorted(os.listdir(path)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(path, name), encoding="utf-8", errors="replace") as f:
+                pages.append(f.read())
+    return pages
+
+
+def make_corpus(count: int) -> List[str]:
+    with open(os.path.join(DATA_DIR, "restaurant_recommendations.json"), encoding="utf-8") as f:
+        restaurants = json.load(f)
+    rnd = random.Random(3)
+    pages = []
+    for i in range(count):
+        r = restaurants[i % len(restaurants)]
+        sentences = r.get("pros", []) + r.get("cons", [])
+        paragraphs = "".join(f"<p>{' '.join(rnd.sample(sentences, min(3, len(sentences))))} <b>{rnd.choice(r.get('keywords', ['맛집']))}</b></p>"
+                             for _ in range(rnd.randint(20, 120)))
+        pages.append(PAGE_TEMPLATE.format(
+            title=f"{r['name']} 방문 후기",
+            nav="".join(f"<a href='/c/{k}'>메뉴{k}</a>" for k in range(30)),
+            paragraphs=paragraphs,
+            sidebar="".join(f"<li><a href='/p/{k}'>다른 글 {k}</a></li>" for k in range(50)),
+        ))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", help="벤치마크에 쓸 .html 파일 디렉터리")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=html_extract.HTML_EXTRACT_WORKERS)
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if args.corpus else make_corpus(args.pages)
+    print(f"페이지: {len(pages)}개, 평균 {sum(map(len, pages)) // max(len(pages), 1):,}자")
+
+    started = time.perf_counter()
+    baseline = [html_extract.extract_main_text(page, "html.parser") for page in pages]
+    print(f"{'html.parser':>12} (기존, 단일 스레드): {len(pages) / (time.perf_counter() - started):,.1f} pages/s")
+
+    for name in html_extract.PARSERS:
+        try:
+            started = time.perf_counter()
+            texts = [html_extract.extract_main_text(page, name) for page in pages]
+            inline = len(pages) / (time.perf_counter() - started)
+        except html_extract.ParserUnavailable as e:
+            print(f"{name:>12}: 건너뜀 ({e})")
+            continue
+
+        pooled = ""
+        if args.workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            import multiprocessing
+            with ProcessPoolExecutor(args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                list(pool.map(html_extract.extract_main_text, pages[:args.workers], [name] * args.workers))  # 워커 기동 시간 제외
+                started = time.perf_counter()
+                list(pool.map(html_extract.extract_main_text, pages, [name] * len(pages), chunksize=4))
+                pooled = f", 프로세스 풀({args.workers}) {len(pages) / (time.perf_counter() - started):,.1f} pages/s"
+
+        exact = sum(a == b for a, b in zip(baseline, texts)) / len(pages)
+        # 줄바꿈/공백 차이를 무시한 유사도 (앞쪽 20페이지 표본)
+        similarity = sum(difflib.SequenceMatcher(None, " ".join(a.split()), " ".join(b.split())).ratio()
+                         for a, b in zip(baseline[:20], texts[:20])) / min(len(pages), 20)
+        print(f"{name:>12}: {inline:,.1f} pages/s{pooled}, 완전 일치 {exact:.1%}, 평균 유사도 {similarity:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""메타데이터 코덱 벤치마크: 예전 '|' 결합 방식과 JSON 코덱의 인코딩/디코딩 처리량 비교
+
+실행: python -m backend.benchmarks.bench_metadata_codec [--rows 10000] [--repeat 3]
+마지막에 '|'가 들어간 값의 왕복(round-trip) 보존 여부도 확인한다.
+"""
+import time
+import random
+import argparse
+from typing import Any, Callable, Dict, List
+
+from backend.app import metadata_codec
+
+
+def legacy_encode(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    # 예전 vectorDBService의 방식: 리스트는 '|'로 결합하고 None은 빈 문자열로 저장
+    stored = {}
+    for key, value in metadata.items():
+        if isinstance(value, list):
+            stored[key] = "|".join(map(str, value))
+        elif value is None:
+            stored[key] = ""
+        else:
+            stored[key] = value
+    return stored
+
+
+def make_rows(n: int) -> List[Dict[str, Any]]:
+    rnd = random.Random(42)
+    words = ["분위기", "가성비", "친절", "웨이팅", "주차", "데이트", "매콤", "담백", "양많음", "청결"]
+    regions = ["서울 강남구", "서울 마포구", "부산 해운대구", "대구 중구"]
+    rows = []
+    for i in range(n):
+        rows.append({
+            "name": f"맛집{i}",
+            "address": f"{rnd.choice(regions)} 어딘가로 {i}",
+            "image_url": f"https://example.com/{i}.jpg",
+            "mapx": 127.0 + rnd.random(), "mapy": 37.0 + rnd.random(),
+            "review_trust_score": rnd.randint(0, 100),
+            "summary_price": "1~2만원",
+            "summary_pros": [f"{rnd.choice(words)} 좋아요" for _ in range(4)],
+            "summary_cons": [f"{rnd.choice(words)} 아쉬워요" for _ in range(2)],
+            "keywords": rnd.sample(words, 5),
+            "nearby_attractions": ["공원", "미술관"],
+            "categories": ["한식", "고기"],
+        })
+    return rows
+
+
+def throughput(fn: Callable, items: List[Any], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return len(items) * repeat / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    legacy_rows = [legacy_encode(r) for r in rows]
+    codec_rows = metadata_codec.encode_many(rows)
+    print(f"행 수: {len(rows)} (JSON 라이브러리: {'orjson' if metadata_codec.orjson else 'json'})")
+    print(f" legacy: encode/s {throughput(legacy_encode, rows, args.repeat):,.0f}, "
+          f"decode/s {throughput(metadata_codec.decode, legacy_rows, args.repeat):,.0f}")
+    print(f"  codec: encode/s {throughput(metadata_codec.encode, rows, args.repeat):,.0f}, "
+          f"decode/s {throughput(metadata_codec.decode, codec_rows, args.repeat):,.0f}")
+
+    # '|'가 들어간 값의 왕복 확인
+    tricky = dict(rows[0], summary_pros=["A|B 세트가 좋아요", "C"], summary_paring="와인|맥주", keywords=[])
+    legacy_ok = metadata_codec.decode(legacy_encode(tricky)) == tricky
+    codec_ok = metadata_codec.decode(metadata_codec.encode(tricky)) == tricky
+    print(f"'|' 포함 값 왕복 보존: legacy {legacy_ok}, codec {codec_ok}")
+
+
+if __name__ == "__main__":
+    main()
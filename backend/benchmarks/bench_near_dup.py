@@ -0,0 +1,98 @@
+"""리뷰 스니펫 교차 검증 벤치마크: 기존 difflib 구현, 정확한 기본 경로, LSH 인덱스(근사) 경로의 결과 일치 여부와 처리 시간 비교
+
+실행: python -m backend.benchmarks.bench_near_dup [--sizes 20 100 300] [--trials 20]
+스니펫은 backend_test의 맛집 장단점/설명 문장으로 만들고, 다음(daum) 쪽은 일부를 변형해 유사 중복을 섞는다.
+"""
+import os
+import json
+import time
+import random
+import difflib
+import argparse
+from typing import List, Tuple
+
+from backend.app import near_dup
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "backend_test")
+
+
+def load_sentences() -> List[str]:
+    with open(os.path.join(DATA_DIR, "restaurant_recommendations.json"), encoding="utf-8") as f:
+        sentences = [text for r in json.load(f) for text in (r.get("pros", []) + r.get("cons", []))]
+    with open(os.path.join(DATA_DIR, "search_results.json"), encoding="utf-8") as f:
+        sentences += [r["description"] for r in json.load(f) if r.get("description")]
+    return sentences
+
+
+def reference(naver_snips: List[str], daum_snips: List[str], threshold: float) -> Tuple[List[str], int]:
+    # 변경 전 service.cross_validate_review_sets 구현 그대로
+    merged_texts, cross_count = [], 0
+    used_daum_indices = set()
+    for n_snip in naver_snips:
+        for i, d_snip in enumerate(daum_snips):
+            if i in used_daum_indices: continue
+            if difflib.SequenceMatcher(None, n_snip, d_snip).ratio() > threshold:
+                used_daum_indices.add(i)
+                cross_count += 1
+                break
+        merged_texts.append(n_snip)
+    for i, d_snip in enumerate(daum_snips):
+        if i not in used_daum_indices:
+            merged_texts.append(d_snip)
+    total_snips = len(merged_texts)
+    score = int((cross_count * 2 / max(total_snips, 1)) * 100) if total_snips else 0
+    return merged_texts, min(score, 100)
+
+
+def perturb(text: str, rnd: random.Random) -> str:
+    words = text.split()
+    op = rnd.random()
+    if op < 0.3 and len(words) > 3:
+        del words[rnd.randrange(len(words))]
+    elif op < 0.6:
+        words.insert(rnd.randrange(len(words) + 1), rnd.choice(["정말", "진짜", "완전", "너무"]))
+    elif op < 0.8 and len(words) > 2:
+        i = rnd.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    return " ".join(words) + rnd.choice(["", " ㅎㅎ", "!!", " 추천합니다"])
+
+
+def make_sets(sentences: List[str], size: int, rnd: random.Random) -> Tuple[List[str], List[str]]:
+    pool = [s for s in sentences for _ in range(max(1, size // len(sentences) + 1))]
+    naver = [s + f" ({i})" if i >= len(sentences) else s for i, s in enumerate(rnd.sample(pool, size))]
+    overlap = rnd.sample(naver, size // 2)
+    others = rnd.sample(sentences, min(len(sentences), size - len(overlap)))
+    daum = [perturb(s, rnd) for s in overlap] + others
+    rnd.shuffle(daum)
+    return naver, daum
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 300])
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=near_dup.SNIPPET_MATCH_THRESHOLD)
+    args = parser.parse_args()
+
+    sentences = load_sentences()
+    rnd = random.Random(7)
+    for size in args.sizes:
+        agree = {False: 0, True: 0}
+        elapsed = {None: 0.0, False: 0.0, True: 0.0}
+        for _ in range(args.trials):
+            naver, daum = make_sets(sentences, size, rnd)
+            started = time.perf_counter()
+            expected = reference(naver, daum, args.threshold)
+            elapsed[None] += time.perf_counter() - started
+            for use_index in (False, True):
+                started = time.perf_counter()
+                actual = near_dup.cross_validate_review_sets(naver, daum, args.threshold, use_index=use_index)
+                elapsed[use_index] += time.perf_counter() - started
+                agree[use_index] += expected == actual
+        ms = {k: v / args.trials * 1000 for k, v in elapsed.items()}
+        print(f"{size:>4}x{size:<4} difflib {ms[None]:,.1f}ms | 정확 경로 일치 {agree[False]}/{args.trials}, {ms[False]:,.1f}ms"
+              f" | LSH 일치 {agree[True]}/{args.trials}, {ms[True]:,.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
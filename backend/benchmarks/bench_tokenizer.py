@@ -0,0 +1,84 @@
+"""형태소 분석 백엔드 벤치마크: 처리량과 Okt 대비 토큰 겹침 비율 비교
+
+실행: python -m backend.benchmarks.bench_tokenizer [--repeat 5]
+말뭉치는 backend_test/restaurant_recommendations.json의 장단점 문장을 사용한다.
+"""
+import os
+import json
+import time
+import argparse
+from typing import Dict, List
+
+from backend.app import tokenizer
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "backend_test", "restaurant_recommendations.json")
+
+
+def load_corpus() -> List[str]:
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        restaurants = json.load(f)
+    return [text for r in restaurants for text in (r.get("pros", []) + r.get("cons", []))]
+
+
+def jaccard(a: List[str], b: List[str]) -> float:
+    sa, sb = set(a), set(b)
+    if not sa and not sb:
+        return 1.0
+    return len(sa & sb) / len(sa | sb)
+
+
+def bench(backend: str, texts: List[str], repeat: int) -> Dict[str, float]:
+    tok = tokenizer.get_tokenizer(backend)
+    tok.load()  # 로딩 시간(JVM 기동 등)은 처리량에서 제외
+    cleaned = [tokenizer.clean_text(t) for t in texts]
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in cleaned:
+            tok.tokenize(text)
+    single = len(cleaned) * repeat / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        tok.tokenize_batch(cleaned)
+    batch = len(cleaned) * repeat / (time.perf_counter() - started)
+
+    # 캐시 적중 시 처리량 (같은 말뭉치를 반복 전처리)
+    tokenizer.tokenization_cache.clear()
+    tokenizer.preprocess_batch(texts, backend)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        tokenizer.preprocess_batch(texts, backend)
+    cached = len(texts) * repeat / (time.perf_counter() - started)
+    return {"single/s": single, "batch/s": batch, "cached/s": cached}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    texts = load_corpus()
+    print(f"말뭉치: {len(texts)}문장")
+
+    outputs = {}
+    for backend in tokenizer.BACKENDS:
+        try:
+            stats = bench(backend, texts, args.repeat)
+        except Exception as e:
+            print(f"{backend:>7}: 건너뜀 ({e})")
+            continue
+        outputs[backend] = tokenizer.get_tokenizer(backend).tokenize_batch([tokenizer.clean_text(t) for t in texts])
+        print(f"{backend:>7}: " + ", ".join(f"{k} {v:,.0f}" for k, v in stats.items()))
+
+    baseline = outputs.get("okt")
+    if baseline is None:
+        print("Okt를 사용할 수 없어 토큰 겹침 비교를 생략합니다.")
+        return
+    for backend, tokens in outputs.items():
+        overlap = sum(jaccard(a, b) for a, b in zip(baseline, tokens)) / len(tokens)
+        print(f"{backend:>7}: Okt 대비 평균 Jaccard {overlap:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""crud.get_or_create_restaurant_in_postgres가 이름+주소로 기존 맛집을 찾아 재사용하는지 확인 (SQLite 메모리 DB)"""
+import os
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("passlib")
+pytest.importorskip("pgvector")
+pytest.importorskip("pydantic")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app import crud, models
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    models.Restaurant.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_get_or_create_restaurant_reuses_existing_row(db):
+    first = crud.get_or_create_restaurant_in_postgres(db, name="을지로 노포", address="서울 중구 을지로 1")
+    again = crud.get_or_create_restaurant_in_postgres(db, name="을지로 노포", address="서울 중구 을지로 1")
+    other = crud.get_or_create_restaurant_in_postgres(db, name="을지로 노포", address="서울 중구 을지로 2")
+    assert again.id == first.id
+    assert other.id != first.id
+    assert db.query(models.Restaurant).count() == 2
@@ -0,0 +1,46 @@
+"""near_dup.cross_validate_review_sets가 기존 difflib 전체 비교와 같은 (병합 결과, 신뢰도 점수)를 내는지 확인
+
+스니펫 묶음은 backend_test에 기록된 맛집 장단점/설명 문장으로 만든다 (bench_near_dup과 같은 방식).
+"""
+import random
+
+import pytest
+
+from backend.app import near_dup
+from backend.benchmarks.bench_near_dup import load_sentences, make_sets, reference
+
+
+@pytest.fixture(scope="module")
+def sentences():
+    return load_sentences()
+
+
+@pytest.mark.parametrize("size", [5, 20, 60, 100])
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_difflib_on_recorded_snippets(sentences, size, seed):
+    naver, daum = make_sets(sentences, size, random.Random(seed))
+    assert near_dup.cross_validate_review_sets(naver, daum) == reference(naver, daum, near_dup.SNIPPET_MATCH_THRESHOLD)
+
+
+@pytest.mark.parametrize("threshold", [0.4, 0.6, 0.8])
+def test_matches_difflib_across_thresholds(sentences, threshold):
+    naver, daum = make_sets(sentences, 40, random.Random(11))
+    assert near_dup.cross_validate_review_sets(naver, daum, threshold) == reference(naver, daum, threshold)
+
+
+def test_recorded_sentences_against_themselves(sentences):
+    # 같은 문장끼리는 모두 교차 검증되어야 함
+    naver, daum = sentences[:30], list(reversed(sentences[:30]))
+    assert near_dup.cross_validate_review_sets(naver, daum) == reference(naver, daum, near_dup.SNIPPET_MATCH_THRESHOLD)
+
+
+def test_empty_inputs():
+    assert near_dup.cross_validate_review_sets([], []) == ([], 0)
+    assert near_dup.cross_validate_review_sets(["맛있어요"], []) == reference(["맛있어요"], [], near_dup.SNIPPET_MATCH_THRESHOLD)
+
+
+def test_lsh_is_opt_in(sentences):
+    # 쌍이 많아도 SNIPPET_USE_LSH를 켜지 않으면 근사 인덱스를 쓰지 않음
+    assert not near_dup.SNIPPET_USE_LSH
+    naver, daum = make_sets(sentences, 100, random.Random(3))
+    assert near_dup.match_snippets(naver, daum) == near_dup.match_snippets(naver, daum, use_index=False)
@@ -0,0 +1,25 @@
+"""snippet_classifier.classify_text가 PYTHONHASHSEED와 무관하게 같은 스니펫을 같은 순서로 내는지 확인"""
+import os
+import subprocess
+import sys
+
+from backend.app import snippet_classifier
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TEXT = ". ".join(f"여기 정말 맛있어요 가격도 괜찮고 {i:02d}번째 방문" for i in range(40)) + ". 분위기 최고 가성비 좋고 재방문 의사 있어요"
+
+
+def test_same_length_snippets_sorted_by_text():
+    texts = [tag.text for tag in snippet_classifier.classify_text(TEXT)]
+    assert len(texts) == snippet_classifier.MAX_SNIPPETS
+    assert texts == sorted(texts, key=lambda t: (-len(t), t))
+
+
+def test_independent_of_hash_seed():
+    script = "from backend.app import snippet_classifier as sc; import sys; print([t.text for t in sc.classify_text(sys.argv[1])])"
+    outputs = {
+        subprocess.run([sys.executable, "-c", script, TEXT], cwd=ROOT, capture_output=True, text=True, check=True,
+                       env={**os.environ, "PYTHONHASHSEED": str(seed)}).stdout
+        for seed in (1, 2, 3)
+    }
+    assert len(outputs) == 1
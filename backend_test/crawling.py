@@ -9,6 +9,8 @@ from bs4 import BeautifulSoup
 from readability.readability import Document
 import google.generativeai as genai
 import re
+import sqlite3
+import hashlib
 
 # 환경 변수 로드
 load_dotenv()
@@ -28,6 +30,43 @@ else:
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# 프롬프트를 바꾸면 버전을 올려야 예전 응답이 LLM 캐시에서 재사용되지 않음
+ANALYSIS_PROMPT_VERSION = "recommender-analysis-v1"
+RECOMMENDATION_PROMPT_VERSION = "recommender-top3-v1"
+# 이 스크립트는 python backend_test/crawling.py로 단독 실행하므로 backend 패키지 대신 자체 캐시 파일을 사용
+LLM_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.db")
+
+
+def _extract_json(text: str, opener: str, closer: str):
+    """```json 코드 블록을 우선 파싱하고, 없으면 첫 opener부터 마지막 closer까지를 파싱 (실패 시 None)"""
+    fenced = re.search(r'```json\s*(' + re.escape(opener) + r'.*?' + re.escape(closer) + r')\s*```', text, re.DOTALL)
+    json_str = fenced.group(1) if fenced else text[text.find(opener):text.rfind(closer) + 1]
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        return None
+
+
+def _cached_generate(version: str, inputs: Any, prompt: str, parse):
+    """(모델, 프롬프트 버전, 입력)이 같으면 저장된 Gemini 응답을 재사용하고 (파싱 결과, 캐시 적중 여부)를 반환"""
+    raw_key = json.dumps([model.model_name, version, inputs], ensure_ascii=False, sort_keys=True, default=str)
+    key = hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+    with sqlite3.connect(LLM_CACHE_PATH) as conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS llm_responses (key TEXT PRIMARY KEY, raw TEXT NOT NULL, created_at TEXT NOT NULL)")
+        row = conn.execute("SELECT raw FROM llm_responses WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            parsed = parse(row[0])
+            if parsed:
+                return parsed, True
+        raw = model.generate_content(prompt).text
+        parsed = parse(raw)
+        # 파싱에 실패한 응답은 저장하지 않음 (다음 실행에서 다시 요청)
+        if parsed:
+            conn.execute("INSERT OR REPLACE INTO llm_responses (key, raw, created_at) VALUES (?, ?, ?)",
+                         (key, raw, datetime.now().isoformat()))
+        return parsed, False
+
+
 class RestaurantRecommender:
     def __init__(self):
         self.session = requests.Session()
@@ -141,18 +180,12 @@ class RestaurantRecommender:
         """
         
         try:
-            response = model.generate_content(prompt)
-            clean_response = re.search(r'```json\s*(\{.*?\})\s*```', response.text, re.DOTALL)
-            if clean_response:
-                json_str = clean_response.group(1)
-                analysis = json.loads(json_str)
-                logging.info(f"Gemini 분석 완료: {restaurant_name}")
-                return analysis
-            else:
-                json_str = response.text[response.text.find('{'):response.text.rfind('}')+1]
-                analysis = json.loads(json_str)
-                logging.info(f"Gemini 분석 완료 (폴백): {restaurant_name}")
-                return analysis
+            inputs = {"kakao_info": kakao_info, "reviews": reviews}
+            analysis, hit = _cached_generate(ANALYSIS_PROMPT_VERSION, inputs, prompt, parse=lambda text: _extract_json(text, '{', '}'))
+            if not analysis:
+                raise ValueError("Gemini 응답에서 JSON을 찾을 수 없습니다.")
+            logging.info(f"Gemini 분석 완료{' (캐시)' if hit else ''}: {restaurant_name}")
+            return analysis
         except Exception as e:
             logging.error(f"Gemini AI 분석 오류 ({restaurant_name}): {e}")
             return {}
@@ -185,18 +218,12 @@ class RestaurantRecommender:
         """
         
         try:
-            response = model.generate_content(prompt)
-            clean_response = re.search(r'```json\s*(\[.*?\])\s*```', response.text, re.DOTALL)
-            if clean_response:
-                json_str = clean_response.group(1)
-                top_3 = json.loads(json_str)
-                logging.info(f"Gemini AI 추천 완료: {len(top_3)}개 맛집 선정")
-                return top_3
-            else:
-                json_str = response.text[response.text.find('['):response.text.rfind(']')+1]
-                top_3 = json.loads(json_str)
-                logging.info(f"Gemini AI 추천 완료 (폴백): {len(top_3)}개 맛집 선정")
-                return top_3
+            inputs = {"user_profile": user_profile, "restaurants": all_restaurants_data}
+            top_3, hit = _cached_generate(RECOMMENDATION_PROMPT_VERSION, inputs, prompt, parse=lambda text: _extract_json(text, '[', ']'))
+            if not top_3:
+                raise ValueError("Gemini 응답에서 JSON 배열을 찾을 수 없습니다.")
+            logging.info(f"Gemini AI 추천 완료{' (캐시)' if hit else ''}: {len(top_3)}개 맛집 선정")
+            return top_3
         except Exception as e:
             logging.error(f"Gemini AI 추천 생성 오류: {e}")
             return all_restaurants_data[:3]